@@ -0,0 +1,169 @@
+import os
+import json
+import numpy as np
+
+# --- FILTER METADATA (SOURCE / KATEGORI) SAAT SCORING ---
+# Saat build, setiap nilai metadata (misal source='kompas') dikodekan sebagai daftar rentang
+# doc index [start, end). Karena dokumen di-ingest per file dataset, satu source selalu menjadi
+# satu rentang berurutan, sehingga query terfilter hanya menyentuh baris matriks milik rentang itu.
+# Nilai yang tersebar di banyak rentang disimpan sebagai bitset (boolean mask yang di-pack).
+
+FILTERS_FILE = "doc_filters.json"
+MASKS_FILE = "doc_filters_masks.npz"
+MAX_RANGES_PER_VALUE = 64 # Lebih dari ini: simpan sebagai bitset
+
+
+class DocSelection:
+    """
+    Himpunan dokumen hasil filter: daftar rentang [start, end) terurut, atau boolean mask.
+
+    Parameters:
+        total_docs (int): Jumlah dokumen di index.
+        ranges (list, optional): Rentang doc index [(start, end), ...].
+        mask (ndarray, optional): Boolean mask sepanjang total_docs (dipakai jika ranges None).
+    """
+
+    def __init__(self, total_docs, ranges=None, mask=None):
+        self.total_docs = total_docs
+        self.ranges = _merge_ranges(ranges) if ranges is not None else None
+        self.mask = mask
+
+    @property
+    def size(self):
+        """Jumlah dokumen yang lolos filter."""
+        if self.ranges is not None:
+            return sum(end - start for start, end in self.ranges)
+        return int(self.mask.sum())
+
+
+class FilterIndex:
+    """Rentang doc index / bitset untuk setiap nilai field metadata, dibuat sekali saat build."""
+
+    def __init__(self, total_docs, ranges, masks=None):
+        self.total_docs = total_docs
+        self.ranges = ranges # {field: {value: [(start, end), ...]}}
+        self.masks = masks or {} # {field: {value: packed bits}}
+
+    @classmethod
+    def build(cls, df_documents, fields):
+        """Menghitung rentang berurutan setiap nilai untuk kolom-kolom `fields` di df_documents."""
+        total_docs = len(df_documents)
+        ranges, masks = {}, {}
+        for field in fields:
+            values = df_documents[field].to_numpy()
+            # Batas rentang: posisi di mana nilai berubah dari baris sebelumnya
+            boundaries = np.flatnonzero(values[1:] != values[:-1]) + 1
+            starts = np.concatenate(([0], boundaries))
+            ends = np.concatenate((boundaries, [total_docs]))
+
+            field_ranges = {}
+            for start, end in zip(starts, ends):
+                field_ranges.setdefault(str(values[start]), []).append((int(start), int(end)))
+
+            ranges[field], masks[field] = {}, {}
+            for value, value_ranges in field_ranges.items():
+                if len(value_ranges) <= MAX_RANGES_PER_VALUE:
+                    ranges[field][value] = value_ranges
+                else:
+                    masks[field][value] = np.packbits(values == value)
+        return cls(total_docs, ranges, masks)
+
+    def values(self, field):
+        """Semua nilai yang dikenal untuk satu field."""
+        return sorted(set(self.ranges.get(field, {})) | set(self.masks.get(field, {})))
+
+    def select(self, filters):
+        """
+        Mengubah filter {field: nilai atau list nilai} menjadi DocSelection.
+        Nilai dalam satu field digabung (OR), antar field diiris (AND). None = tanpa filter.
+        """
+        if not filters:
+            return None
+
+        selection = None
+        for field, values in filters.items():
+            if isinstance(values, str):
+                values = [values]
+            field_selection = self._select_field(field, values)
+            selection = field_selection if selection is None else _intersect(selection, field_selection)
+        return selection
+
+    def save(self, path):
+        with open(os.path.join(path, FILTERS_FILE), 'w', encoding='utf-8') as f:
+            json.dump({'total_docs': self.total_docs, 'ranges': self.ranges}, f)
+        packed = {
+            f"{field}={value}": bits
+            for field, field_masks in self.masks.items() for value, bits in field_masks.items()
+        }
+        if packed:
+            np.savez(os.path.join(path, MASKS_FILE), **packed)
+
+    @classmethod
+    def load(cls, path):
+        """Memuat filter index dari direktori generation."""
+        with open(os.path.join(path, FILTERS_FILE), encoding='utf-8') as f:
+            data = json.load(f)
+        ranges = {
+            field: {value: [tuple(r) for r in value_ranges] for value, value_ranges in field_ranges.items()}
+            for field, field_ranges in data['ranges'].items()
+        }
+
+        masks = {}
+        masks_path = os.path.join(path, MASKS_FILE)
+        if os.path.exists(masks_path):
+            with np.load(masks_path) as packed:
+                for key in packed.files:
+                    field, _, value = key.partition('=')
+                    masks.setdefault(field, {})[value] = packed[key]
+        return cls(data['total_docs'], ranges, masks)
+
+    def _select_field(self, field, values):
+        value_ranges, value_masks = [], []
+        for value in values:
+            if value in self.ranges.get(field, {}):
+                value_ranges.extend(self.ranges[field][value])
+            elif value in self.masks.get(field, {}):
+                value_masks.append(self._unpack(self.masks[field][value]))
+
+        if not value_masks:
+            return DocSelection(self.total_docs, ranges=value_ranges)
+
+        mask = np.logical_or.reduce(value_masks)
+        for start, end in value_ranges:
+            mask[start:end] = True
+        return DocSelection(self.total_docs, mask=mask)
+
+    def _unpack(self, bits):
+        return np.unpackbits(bits, count=self.total_docs).astype(bool)
+
+
+def _merge_ranges(ranges):
+    """Mengurutkan dan menggabungkan rentang yang bersinggungan."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        elif end > start:
+            merged.append((start, end))
+    return merged
+
+
+def _to_mask(selection):
+    if selection.mask is not None:
+        return selection.mask
+    mask = np.zeros(selection.total_docs, dtype=bool)
+    for start, end in selection.ranges:
+        mask[start:end] = True
+    return mask
+
+
+def _intersect(a, b):
+    """Irisan dua DocSelection (tetap berupa rentang jika keduanya rentang)."""
+    if a.ranges is not None and b.ranges is not None:
+        ranges = [
+            (max(a_start, b_start), min(a_end, b_end))
+            for a_start, a_end in a.ranges for b_start, b_end in b.ranges
+            if max(a_start, b_start) < min(a_end, b_end)
+        ]
+        return DocSelection(a.total_docs, ranges=ranges)
+    return DocSelection(a.total_docs, mask=_to_mask(a) & _to_mask(b))
@@ -0,0 +1,131 @@
+import os
+import shutil
+import itertools
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+
+# --- VSM OUT-OF-CORE (HASHING FEATURE SPACE) ---
+# Term di-hash ke ruang fitur berukuran tetap (tanpa kamus vocabulary), dokumen diproses
+# per blok, dan setiap blok CSR langsung ditulis ke disk. Setelah semua blok selesai,
+# blok-blok digabung menjadi satu matriks CSR di file .npy yang dibuka dengan memory-map.
+# Struktur direktori:
+#   <path>/blocks/block_000000_{data,indices,indptr}.npy  -> blok sementara selama build
+#   <path>/matrix_{data,indices,indptr}.npy              -> matriks gabungan (memory-mapped)
+#   <path>/hashed_terms.tsv                              -> (opsional) feature id -> term, untuk debugging
+
+DEFAULT_N_FEATURES = 2 ** 20
+BLOCKS_SUBDIR = "blocks"
+MATRIX_PREFIX = "matrix_"
+TERM_TABLE_FILE = "hashed_terms.tsv"
+CSR_PARTS = ('data', 'indices', 'indptr')
+
+
+def create_hashing_vectorizer(n_features=DEFAULT_N_FEATURES):
+    """HashingVectorizer dengan bobot frekuensi mentah (setara CountVectorizer, tanpa vocabulary)."""
+    return HashingVectorizer(n_features=n_features, alternate_sign=False, norm=None)
+
+
+def build_hashed_matrix(doc_contents, path, vectorizer, block_size=10000, term_table=False):
+    """
+    Membuat matriks dokumen-term secara streaming dari iterable `doc_contents`.
+    Hanya satu blok (`block_size` dokumen) yang berada di memori pada satu waktu.
+    Mengembalikan (doc_term_matrix memory-mapped, doc_norms).
+    """
+    blocks_dir = os.path.join(path, BLOCKS_SUBDIR)
+    os.makedirs(blocks_dir, exist_ok=True)
+
+    block_shapes = []
+    doc_norms = []
+    hashed_terms = {} if term_table else None
+
+    doc_iter = iter(doc_contents)
+    while True:
+        block_docs = list(itertools.islice(doc_iter, block_size))
+        if not block_docs:
+            break
+
+        block = vectorizer.transform(block_docs).tocsr()
+        block.sort_indices()
+        _save_csr(block, os.path.join(blocks_dir, f"block_{len(block_shapes):06d}_"))
+        block_shapes.append((block.shape[0], block.nnz))
+        doc_norms.append(np.sqrt(block.multiply(block).sum(axis=1)).A1)
+
+        if hashed_terms is not None:
+            _update_term_table(hashed_terms, block_docs, vectorizer)
+
+        print(f"\r  -> Hashing VSM: {sum(rows for rows, _ in block_shapes)} dokumen", end="", flush=True)
+    print()
+
+    _stack_blocks(path, block_shapes, vectorizer.n_features)
+    shutil.rmtree(blocks_dir, ignore_errors=True)
+
+    if hashed_terms is not None:
+        with open(os.path.join(path, TERM_TABLE_FILE), 'w', encoding='utf-8') as f:
+            for feature_id in sorted(hashed_terms):
+                f.write(f"{feature_id}\t{' '.join(sorted(hashed_terms[feature_id]))}\n")
+
+    doc_norms = np.concatenate(doc_norms) if doc_norms else np.zeros(0)
+    return load_hashed_matrix(path, vectorizer.n_features), doc_norms
+
+
+def load_hashed_matrix(path, n_features):
+    """Membuka matriks gabungan sebagai CSR yang array-nya memory-mapped (tidak dimuat ke RAM)."""
+    data, indices, indptr = (
+        np.load(os.path.join(path, f"{MATRIX_PREFIX}{part}.npy"), mmap_mode='r') for part in CSR_PARTS
+    )
+    return sparse.csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, n_features), copy=False)
+
+
+def load_term_table(path):
+    """Memuat tabel debugging feature id -> list term. Mengembalikan dict kosong jika tidak dibuat."""
+    table_path = os.path.join(path, TERM_TABLE_FILE)
+    table = {}
+    if os.path.exists(table_path):
+        with open(table_path, encoding='utf-8') as f:
+            for line in f:
+                feature_id, terms = line.rstrip('\n').split('\t')
+                table[int(feature_id)] = terms.split(' ')
+    return table
+
+
+def _save_csr(matrix, prefix):
+    for part in CSR_PARTS:
+        np.save(prefix + f"{part}.npy", getattr(matrix, part))
+
+
+def _stack_blocks(path, block_shapes, n_features):
+    """Menggabungkan blok-blok CSR di disk menjadi satu matriks, tanpa memuat semuanya ke RAM."""
+    total_rows = sum(rows for rows, _ in block_shapes)
+    total_nnz = sum(nnz for _, nnz in block_shapes)
+    index_dtype = np.int64 if max(total_nnz, n_features) > np.iinfo(np.int32).max else np.int32
+
+    out = {
+        'data': np.lib.format.open_memmap(os.path.join(path, f"{MATRIX_PREFIX}data.npy"), mode='w+', dtype=np.float64, shape=(total_nnz,)),
+        'indices': np.lib.format.open_memmap(os.path.join(path, f"{MATRIX_PREFIX}indices.npy"), mode='w+', dtype=index_dtype, shape=(total_nnz,)),
+        'indptr': np.lib.format.open_memmap(os.path.join(path, f"{MATRIX_PREFIX}indptr.npy"), mode='w+', dtype=index_dtype, shape=(total_rows + 1,)),
+    }
+    out['indptr'][0] = 0
+
+    row_offset, nnz_offset = 0, 0
+    for block_number, (rows, nnz) in enumerate(block_shapes):
+        prefix = os.path.join(path, BLOCKS_SUBDIR, f"block_{block_number:06d}_")
+        out['data'][nnz_offset:nnz_offset + nnz] = np.load(prefix + "data.npy")
+        out['indices'][nnz_offset:nnz_offset + nnz] = np.load(prefix + "indices.npy")
+        out['indptr'][row_offset + 1:row_offset + rows + 1] = np.load(prefix + "indptr.npy")[1:] + nnz_offset
+        row_offset += rows
+        nnz_offset += nnz
+
+    for array in out.values():
+        array.flush()
+
+
+def _update_term_table(hashed_terms, block_docs, vectorizer):
+    """Mencatat term unik dalam blok beserta feature id hasil hash-nya."""
+    analyze = vectorizer.build_analyzer()
+    terms = sorted({term for doc in block_docs for term in analyze(doc)})
+    if not terms:
+        return
+    feature_ids = vectorizer.transform(terms).indices
+    for term, feature_id in zip(terms, feature_ids):
+        hashed_terms.setdefault(int(feature_id), set()).add(term)
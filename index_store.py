@@ -0,0 +1,214 @@
+import os
+import json
+import shutil
+import time
+import pandas as pd
+import joblib
+import numpy as np
+from scipy import sparse
+import hashing_vsm
+from typeahead import Typeahead, TYPEAHEAD_FILE
+from doc_filters import FilterIndex, FILTERS_FILE
+from query_analyzer import QueryAnalyzer, QUERY_ANALYZER_FILE
+
+# --- PENYIMPANAN INDEX BERVERSI (GENERATION) ---
+# Struktur direktori:
+#   <root>/CURRENT          -> nama generation yang sedang aktif (ditukar secara atomik)
+#   <root>/gen_000001/      -> satu generation lengkap (Whoosh + data VSM + manifest)
+#   <root>/gen_000002/ ...
+# Build baru selalu ditulis ke generation baru; generation aktif tidak pernah diubah.
+
+CURRENT_FILE = "CURRENT"
+GENERATION_PREFIX = "gen_"
+MANIFEST_FILE = "manifest.json"
+WHOOSH_SUBDIR = "whoosh"
+DOCUMENTS_FILE = "documents.pkl"
+VECTORIZER_FILE = "vectorizer.joblib"
+MATRIX_FILE = "doc_term_matrix.npz"
+DOC_NORMS_FILE = "doc_norms.npy"
+HASHED_SUBDIR = "hashed_vsm" # Matriks mode hashing (blok CSR memory-mapped, lihat hashing_vsm.py)
+TITLE_MATRIX_FILE = "title_term_matrix.npz" # Matriks judul (vocabulary sama dengan matriks konten)
+TITLE_NORMS_FILE = "title_norms.npy"
+HASHED_TITLE_SUBDIR = "hashed_vsm_title"
+
+VSM_MODE_COUNT = "count"
+VSM_MODE_HASHING = "hashing"
+
+
+class IndexGeneration:
+    """Satu snapshot index yang siap dipakai untuk pencarian (tidak diubah setelah dibuat)."""
+
+    def __init__(self, name, path, df_documents, vectorizer, doc_term_matrix, doc_norms, vsm_mode=VSM_MODE_COUNT, typeahead=None, filter_index=None, title_matrix=None, title_norms=None, query_analyzer=None):
+        self.name = name
+        self.path = path
+        self.df_documents = df_documents
+        self.vectorizer = vectorizer
+        self.doc_term_matrix = doc_term_matrix
+        self.doc_norms = doc_norms # Norma L2 tiap dokumen (precomputed untuk Cosine Similarity)
+        self.vsm_mode = vsm_mode
+        self.typeahead = typeahead # Completion prefix & saran ejaan (lihat typeahead.py)
+        self.filter_index = filter_index # Rentang doc index per source/kategori (lihat doc_filters.py)
+        self.title_matrix = title_matrix # Matriks dokumen-term judul (None untuk generation lama)
+        self.title_norms = title_norms
+        self.query_analyzer = query_analyzer # Lookup kata query -> kolom vocabulary (lihat query_analyzer.py)
+        self.scorer = None # Diisi saat generation diaktifkan (lihat ir.activate_index)
+
+    @property
+    def whoosh_dir(self):
+        return os.path.join(self.path, WHOOSH_SUBDIR)
+
+
+def list_generations(root):
+    """Mengembalikan nama semua direktori generation, urut dari yang paling lama."""
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        name for name in os.listdir(root)
+        if name.startswith(GENERATION_PREFIX) and os.path.isdir(os.path.join(root, name))
+    )
+
+
+def create_generation_dir(root):
+    """Membuat direktori generation baru dengan nomor urut berikutnya."""
+    os.makedirs(root, exist_ok=True)
+    existing = list_generations(root)
+    next_number = int(existing[-1][len(GENERATION_PREFIX):]) + 1 if existing else 1
+    name = f"{GENERATION_PREFIX}{next_number:06d}"
+    path = os.path.join(root, name)
+    os.makedirs(os.path.join(path, WHOOSH_SUBDIR))
+    return name, path
+
+
+def save_generation(path, df_documents, vectorizer, doc_term_matrix, doc_norms, vsm_mode=VSM_MODE_COUNT, title_matrix=None, title_norms=None):
+    """
+    Menyimpan data VSM ke direktori generation. Manifest ditulis paling akhir.
+    Pada mode hashing, matriks sudah ditulis ke disk oleh hashing_vsm (tidak disimpan ulang).
+    """
+    df_documents.to_pickle(os.path.join(path, DOCUMENTS_FILE))
+    joblib.dump(vectorizer, os.path.join(path, VECTORIZER_FILE))
+    np.save(os.path.join(path, DOC_NORMS_FILE), doc_norms)
+    if vsm_mode == VSM_MODE_COUNT:
+        sparse.save_npz(os.path.join(path, MATRIX_FILE), doc_term_matrix)
+
+    fields = ['content']
+    if title_matrix is not None:
+        fields.append('title')
+        np.save(os.path.join(path, TITLE_NORMS_FILE), title_norms)
+        if vsm_mode == VSM_MODE_COUNT:
+            sparse.save_npz(os.path.join(path, TITLE_MATRIX_FILE), title_matrix)
+
+    manifest = {
+        'created_at': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'vsm_mode': vsm_mode,
+        'fields': fields,
+        'total_docs': int(doc_term_matrix.shape[0]),
+        'total_terms': int(doc_term_matrix.shape[1]),
+    }
+    _write_atomic(os.path.join(path, MANIFEST_FILE), json.dumps(manifest, indent=2))
+
+
+def load_generation(root, name):
+    """Memuat generation dari disk dan memverifikasi isinya. Raise ValueError jika tidak valid."""
+    path = os.path.join(root, name)
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        raise ValueError(f"Generation '{name}' belum lengkap (manifest tidak ditemukan).")
+
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    vsm_mode = manifest.get('vsm_mode', VSM_MODE_COUNT)
+    df_documents = pd.read_pickle(os.path.join(path, DOCUMENTS_FILE))
+    vectorizer = joblib.load(os.path.join(path, VECTORIZER_FILE))
+    if vsm_mode == VSM_MODE_HASHING:
+        doc_term_matrix = hashing_vsm.load_hashed_matrix(os.path.join(path, HASHED_SUBDIR), manifest['total_terms'])
+    else:
+        doc_term_matrix = sparse.load_npz(os.path.join(path, MATRIX_FILE)).tocsr()
+    doc_norms = np.load(os.path.join(path, DOC_NORMS_FILE))
+
+    title_matrix, title_norms = None, None
+    if 'title' in manifest.get('fields', ()):
+        if vsm_mode == VSM_MODE_HASHING:
+            title_matrix = hashing_vsm.load_hashed_matrix(os.path.join(path, HASHED_TITLE_SUBDIR), manifest['total_terms'])
+        else:
+            title_matrix = sparse.load_npz(os.path.join(path, TITLE_MATRIX_FILE)).tocsr()
+        title_norms = np.load(os.path.join(path, TITLE_NORMS_FILE))
+        if title_matrix.shape != doc_term_matrix.shape or len(title_norms) != len(df_documents):
+            raise ValueError(f"Generation '{name}' tidak konsisten: ukuran matriks judul berbeda.")
+
+    if doc_term_matrix.shape[0] != len(df_documents) or len(df_documents) != manifest['total_docs']:
+        raise ValueError(f"Generation '{name}' tidak konsisten: jumlah dokumen berbeda.")
+    if doc_term_matrix.shape[1] != manifest['total_terms']:
+        raise ValueError(f"Generation '{name}' tidak konsisten: jumlah term berbeda.")
+    if len(doc_norms) != len(df_documents):
+        raise ValueError(f"Generation '{name}' tidak konsisten: jumlah norma dokumen berbeda.")
+
+    for file_name in (TYPEAHEAD_FILE, FILTERS_FILE, QUERY_ANALYZER_FILE):
+        _require_file(path, name, file_name)
+    typeahead = Typeahead.load(path)
+    filter_index = FilterIndex.load(path)
+    if filter_index.total_docs != len(df_documents):
+        raise ValueError(f"Generation '{name}' tidak konsisten: jumlah dokumen filter berbeda.")
+    query_analyzer = QueryAnalyzer.load(path, vectorizer)
+    if query_analyzer.n_features != doc_term_matrix.shape[1]:
+        raise ValueError(f"Generation '{name}' tidak konsisten: jumlah term query analyzer berbeda.")
+
+    return IndexGeneration(name, path, df_documents, vectorizer, doc_term_matrix, doc_norms, vsm_mode, typeahead, filter_index, title_matrix, title_norms, query_analyzer)
+
+
+def _require_file(path, name, file_name):
+    """Raise ValueError jika file `file_name` tidak ada di generation (build tidak selesai menulisnya)."""
+    if not os.path.exists(os.path.join(path, file_name)):
+        raise ValueError(f"Generation '{name}' belum lengkap ({file_name} tidak ditemukan).")
+
+
+def read_current(root):
+    """Mengembalikan nama generation aktif, atau None jika belum ada."""
+    current_path = os.path.join(root, CURRENT_FILE)
+    if not os.path.exists(current_path):
+        return None
+    with open(current_path, encoding='utf-8') as f:
+        name = f.read().strip()
+    return name or None
+
+
+def swap_current(root, name):
+    """Menukar pointer CURRENT ke generation baru secara atomik (os.replace)."""
+    _write_atomic(os.path.join(root, CURRENT_FILE), name)
+
+
+def collect_garbage(root, keep=2, exclude=()):
+    """
+    Menghapus generation lama. Yang dipertahankan: generation aktif, `keep - 1` generation
+    lengkap sebelumnya (untuk rollback), dan nama-nama di `exclude` (misal build yang sedang berjalan).
+    Build gagal/terbengkalai ikut terhapus. Mengembalikan list nama generation yang dihapus.
+    """
+    current = read_current(root)
+    generations = list_generations(root)
+
+    kept = set(exclude)
+    if current:
+        kept.add(current)
+        previous = [
+            name for name in generations
+            if name < current and os.path.exists(os.path.join(root, name, MANIFEST_FILE))
+        ]
+        if keep > 1:
+            kept.update(previous[-(keep - 1):])
+
+    removed = []
+    for name in generations:
+        if name not in kept:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+            removed.append(name)
+    return removed
+
+
+def _write_atomic(path, content):
+    """Menulis file lewat file sementara + fsync + os.replace agar tidak pernah setengah jadi."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
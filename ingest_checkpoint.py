@@ -0,0 +1,159 @@
+import os
+import csv
+import json
+import pickle
+import shutil
+
+# --- CHECKPOINT INGESTION (RESUMABLE) ---
+# Hasil preprocessing disimpan per chunk ke disk, sehingga build yang terputus
+# (crash / Ctrl-C) bisa dilanjutkan dari chunk terakhir yang sudah di-commit.
+# Selama build, chunk juga menjadi sumber teks dokumen: konten/judul dibaca ulang per chunk
+# dari disk (lihat ir.iter_document_field), sehingga teks korpus tidak pernah utuh di memori.
+# Struktur direktori:
+#   <root>/<source>/state.json         -> status file dataset + daftar chunk yang sudah di-commit
+#   <root>/<source>/chunk_000000.pkl   -> list record hasil preprocessing satu chunk
+
+STATE_FILE = "state.json"
+CHUNK_PREFIX = "chunk_"
+# Naikkan jika isi record chunk berubah: checkpoint dengan versi lain dibuang saat load_state
+CHECKPOINT_FORMAT = 2 # 2: record menyimpan 'clean_title'
+
+
+def iter_csv_rows(file_path, byte_offset=0, encoding='latin1'):
+    """
+    Membaca CSV baris demi baris mulai dari `byte_offset`.
+    Menghasilkan (row, byte_end): byte_end adalah posisi byte tepat setelah row tersebut,
+    sehingga pembacaan bisa dilanjutkan persis dari titik itu (field multi-baris tetap aman).
+    """
+    with open(file_path, 'rb') as f:
+        f.seek(byte_offset)
+        position = byte_offset
+
+        def lines():
+            nonlocal position
+            for raw_line in f:
+                position += len(raw_line)
+                yield raw_line.decode(encoding)
+
+        # csv.reader hanya mengambil baris sebanyak yang dibutuhkan satu record (tanpa lookahead)
+        for row in csv.reader(lines()):
+            yield row, position
+
+
+class IngestCheckpoint:
+    """Menyimpan dan memuat chunk hasil preprocessing per file dataset."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def load_state(self, source, file_path):
+        """
+        Memuat state checkpoint untuk satu file dataset. Jika file berubah sejak checkpoint
+        dibuat (ukuran/mtime berbeda) atau format chunk-nya berbeda, checkpoint lama dibuang
+        dan mulai dari awal.
+        """
+        stat = os.stat(file_path)
+        fresh_state = {
+            'format': CHECKPOINT_FORMAT,
+            'source': source,
+            'file_path': file_path,
+            'file_size': stat.st_size,
+            'file_mtime': stat.st_mtime,
+            'header': None,
+            'text_column': None,
+            'title_column': None,
+            'chunks': [],
+            'completed': False,
+        }
+
+        state_path = os.path.join(self.root, source, STATE_FILE)
+        if os.path.exists(state_path):
+            with open(state_path, encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('format') != CHECKPOINT_FORMAT:
+                print(f"  -> Checkpoint {source} memakai format lama. Mulai dari awal.")
+            elif state['file_size'] == stat.st_size and state['file_mtime'] == stat.st_mtime:
+                return state
+            else:
+                print(f"  -> File {file_path} berubah sejak checkpoint terakhir. Mulai dari awal.")
+
+        shutil.rmtree(os.path.join(self.root, source), ignore_errors=True)
+        os.makedirs(os.path.join(self.root, source))
+        self._save_state(fresh_state)
+        return fresh_state
+
+    def resume_position(self, state):
+        """Mengembalikan (row_offset, byte_offset) setelah chunk terakhir yang sudah di-commit."""
+        if state['chunks']:
+            last_chunk = state['chunks'][-1]
+            return last_chunk['row_end'], last_chunk['byte_end']
+        return 0, state.get('header_end', 0)
+
+    def set_columns(self, state, header, header_end, text_column, title_column):
+        """Mencatat header dan kolom yang dipakai agar resume memakai kolom yang sama."""
+        state.update({
+            'header': header,
+            'header_end': header_end,
+            'text_column': text_column,
+            'title_column': title_column,
+        })
+        self._save_state(state)
+
+    def commit_chunk(self, state, records, row_start, row_end, byte_start, byte_end):
+        """Menulis satu chunk ke disk (atomik), lalu mencatatnya di state."""
+        chunk_name = f"{CHUNK_PREFIX}{len(state['chunks']):06d}.pkl"
+        chunk_path = os.path.join(self.root, state['source'], chunk_name)
+
+        tmp_path = chunk_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(records, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, chunk_path)
+
+        # Chunk baru dianggap "committed" setelah tercatat di state.json
+        state['chunks'].append({
+            'name': chunk_name,
+            'row_start': row_start,
+            'row_end': row_end,
+            'byte_start': byte_start,
+            'byte_end': byte_end,
+            'docs': len(records),
+        })
+        self._save_state(state)
+
+    def mark_completed(self, state):
+        """Mencatat bahwa seluruh isi file dataset sudah selesai diproses."""
+        state['completed'] = True
+        self._save_state(state)
+
+    def read_state(self, source):
+        """Membaca state checkpoint yang sudah ada (tanpa validasi file dataset). None jika belum ada."""
+        state_path = os.path.join(self.root, source, STATE_FILE)
+        if not os.path.exists(state_path):
+            return None
+        with open(state_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def count_docs(self, state):
+        """Jumlah dokumen di semua chunk yang sudah di-commit."""
+        return sum(chunk['docs'] for chunk in state['chunks'])
+
+    def iter_chunks(self, state):
+        """Membaca chunk yang sudah di-commit satu per satu dari disk (hanya satu chunk di memori)."""
+        for chunk in state['chunks']:
+            with open(os.path.join(self.root, state['source'], chunk['name']), 'rb') as f:
+                yield pickle.load(f)
+
+    def clear(self):
+        """Menghapus seluruh checkpoint (dipanggil setelah build berhasil)."""
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _save_state(self, state):
+        state_path = os.path.join(self.root, state['source'], STATE_FILE)
+        tmp_path = state_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, state_path)
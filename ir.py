@@ -1,76 +1,275 @@
 import os
 import sys
+import shutil
+import itertools
+import functools
 import pandas as pd
-import re
 from whoosh.index import create_in, open_dir
 from whoosh.fields import Schema, TEXT, ID, STORED
-from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
 from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 import time
+import threading
+from text_normalizer import TextNormalizer
+import index_store
+import hashing_vsm
+from parallel_scoring import BlockScorer, choose_n_blocks
+from concurrent.futures import ThreadPoolExecutor
+from typeahead import Typeahead
+from search_sessions import SearchSessionStore, make_cursor, parse_cursor
+from doc_filters import FilterIndex
+from ingest_checkpoint import IngestCheckpoint, iter_csv_rows
+from pipeline_profiler import PipelineProfiler
+from query_analyzer import QueryAnalyzer
 import csv # Import library csv
 
+try:
+    import readline # Tab-completion di prompt query (tidak tersedia di semua platform, misal Windows)
+except ImportError:
+    readline = None
+
 # Menambah batas ukuran field untuk mengatasi error field terlalu besar pada CSV korup
 # Ini sering terjadi pada file tesis/disertasi
 csv.field_size_limit(sys.maxsize) 
 
 
 # --- KONFIGURASI GLOBAL ---
+# Direktori root index. Setiap build ditulis ke generation baru (gen_XXXXXX) di dalamnya,
+# lalu pointer CURRENT ditukar secara atomik setelah build terverifikasi.
 INDEX_DIR = "whoosh_index"
+KEEP_GENERATIONS = 2 # Generation aktif + 1 generation sebelumnya (untuk rollback)
 dataset_PATH = "dataset"
 # Daftar file CSV WAJIB. Jika ingin debugging 1 dataset, ubah list ini (misal: ["etd-ugm.csv"])
 DATASET_FILES = ["etd_usk.csv", "etd_ugm.csv", "kompas.csv", "tempo.csv", "mojok.csv"]
 
-# Variabel Global untuk VSM dan Data
-df_documents = pd.DataFrame()
-vectorizer = None
-doc_term_matrix = None
-doc_contents = [] 
-
-# Inisialisasi Sastrawi (Stemmer & Stopword Removal)
-stemmer = StemmerFactory().create_stemmer()
-from Sastrawi.StopWordRemover.StopWordRemoverFactory import StopWordRemoverFactory
-stopword_factory = StopWordRemoverFactory()
-stop_words = stopword_factory.get_stop_words()
+# --- PENTING: KOLOM TEXT DAN JUDUL ANDA ---
+# Ganti 'konten' dan 'judul' jika nama kolom di CSV Anda berbeda.
+TEXT_COLUMN_CANDIDATES = ['konten', 'judul', 'content', 'text', 'abstract', 'body']
+# -------------------------------------------------------------------
+
+# Checkpoint ingestion: hasil preprocessing di-commit per chunk agar build panjang bisa dilanjutkan
+CHECKPOINT_DIR = os.path.join(INDEX_DIR, "ingest_checkpoint")
+CHECKPOINT_CHUNK_ROWS = 1000
+
+# Kategori koleksi per source, dipakai untuk filter pencarian (misal hanya tesis atau hanya berita)
+SOURCE_CATEGORIES = {
+    'etd_usk': 'tesis',
+    'etd_ugm': 'tesis',
+    'kompas': 'berita',
+    'tempo': 'berita',
+    'mojok': 'berita',
+}
+# Field metadata yang bisa difilter (dikodekan sebagai rentang doc index saat build)
+FILTER_FIELDS = ['source', 'category']
+
+# Mode VSM: "count" (CountVectorizer, vocabulary di memori) atau
+# "hashing" (out-of-core: term di-hash ke ruang fitur tetap, blok CSR ditulis ke disk & di-memory-map)
+VSM_MODE = index_store.VSM_MODE_COUNT
+HASHING_N_FEATURES = hashing_vsm.DEFAULT_N_FEATURES
+HASHING_BLOCK_DOCS = 10000
+HASHING_TERM_TABLE = False # True: simpan tabel feature id -> term (hashed_terms.tsv) untuk debugging
+
+# Scoring paralel: matriks dipecah per blok baris saat index dimuat, satu query di-scoring
+# ke semua blok dengan thread pool. Set SCORING_THREADS = 1 untuk scoring 1 thread.
+SCORING_THREADS = os.cpu_count() or 1
+SCORING_MIN_BLOCK_ROWS = 50000 # Korpus kecil tetap 1 blok (overhead thread lebih besar dari manfaatnya)
+
+# Bobot field untuk ranking multi-field: skor akhir = jumlah berbobot Cosine Similarity tiap field,
+# jadi judul yang cocok menambah skor (boost) tanpa mengurangi skor dokumen yang tidak punya judul.
+# Judul dan konten memakai vocabulary yang sama, sehingga satu vektor query dipakai untuk keduanya.
+# Bobot bisa diubah tanpa build ulang (diterapkan saat index dimuat). Set 'title': 0 untuk mematikan.
+FIELD_WEIGHTS = {'content': 1.0, 'title': 0.5}
+
+# Typeahead: jumlah completion per prefix dan saran ejaan untuk term query yang tidak ada di index
+TYPEAHEAD_TOP_N = 10
+SPELLING_SUGGESTIONS = 3
+
+# Pagination: hasil ranking disimpan per sesi (prefix terurut) agar halaman berikutnya tidak di-scoring ulang
+PAGE_SIZE = 5
+SESSION_MAX = 128 # Jumlah sesi pencarian yang disimpan (LRU)
+SESSION_PREFIX_SIZE = 50 # Jumlah hasil yang di-ranking saat query pertama kali dijalankan
+SESSION_MAX_PREFIX_SIZE = 5000 # Batas hasil yang disimpan per sesi (membatasi memori)
+
+# Profiling build: catat RSS, memori Python (tracemalloc) dan dokumen/detik di setiap fase, serta
+# ukuran struktur data utama. Report JSON ditulis ke PROFILE_DIR. Aktifkan juga dengan: python ir.py --profile
+PROFILE_BUILD = False
+PROFILE_DIR = os.path.join(INDEX_DIR, "profiles")
+
+# Index aktif untuk pencarian (IndexGeneration: df_documents, vectorizer, doc_term_matrix, doc_norms).
+# Objek ini tidak pernah diubah isinya; build baru menggantinya secara utuh (swap referensi).
+active_index = None
+
+# Thread pool bersama untuk scoring paralel (dipakai semua generation)
+scoring_executor = ThreadPoolExecutor(max_workers=SCORING_THREADS, thread_name_prefix="scoring") if SCORING_THREADS > 1 else None
+
+# Sesi pencarian untuk pagination (cursor -> prefix ranking)
+session_store = SearchSessionStore(SESSION_MAX, SESSION_PREFIX_SIZE, SESSION_MAX_PREFIX_SIZE)
+
+# Status build background (hanya satu build yang boleh berjalan)
+build_thread = None
+build_lock = threading.Lock()
+
+# Inisialisasi Normalizer (Stemming Sastrawi & Stopword Removal)
+# Instance yang sama dipakai untuk indexing dan query agar tokennya identik.
+normalizer = TextNormalizer(stem=True)
 
 
 # --- FASE I: PREPROCESSING ---
 def preprocess_text(text):
     """Melakukan Preprocessing Teks (Case Folding, Cleaning, Stemming, Stopword Removal)."""
-    if pd.isna(text) or text is None:
-        return ""
+    return normalizer.normalize(text)
+
+def detect_columns(file_path, sample_rows=CHECKPOINT_CHUNK_ROWS):
+    """
+    Membaca header dan sampel baris pertama untuk menentukan kolom teks & judul.
+    Mengembalikan (header, header_end, text_column, title_column); text_column None jika tidak ada.
+    """
+    rows = iter_csv_rows(file_path)
+    header, header_end = next(rows, (None, 0))
+    if not header:
+        return None, 0, None, None
+
+    samples = list(itertools.islice(rows, sample_rows))
+
+    # 1. Mencari kolom teks utama (Konten): kolom kandidat pertama yang memiliki isi
+    text_column = None
+    for col in TEXT_COLUMN_CANDIDATES:
+        if col in header:
+            col_index = header.index(col)
+            if any(len(row) > col_index and row[col_index] for row, _ in samples):
+                text_column = col
+                break
+
+    # 2. Mencari kolom Judul
+    title_column = 'judul' if 'judul' in header else (
+        'title' if 'title' in header else text_column
+    )
+    return header, header_end, text_column, title_column
+
+def ingest_dataset_file(file_name, file_path, source, checkpoint):
+    """
+    Memproses satu file dataset per chunk. Setiap chunk yang selesai langsung di-commit ke
+    checkpoint (beserta offset baris & byte), sehingga build yang terputus bisa dilanjutkan.
+    Record tidak disimpan di memori (dibaca ulang dari chunk saat dibutuhkan, lihat iter_document_field).
+    Mengembalikan jumlah dokumen, atau None jika file dilewati.
+    """
+    state = checkpoint.load_state(source, file_path)
+    total_docs = checkpoint.count_docs(state)
+
+    if state['completed']:
+        print(f"  -> {file_name} sudah selesai diproses sebelumnya ({total_docs} dokumen dari checkpoint).")
+        return total_docs
+
+    if state['header'] is None:
+        header, header_end, text_column, title_column = detect_columns(file_path)
+        if text_column is None:
+            print(f"  [SKIPPED] Tidak ditemukan kolom teks relevan di {file_name}")
+            return None
+        checkpoint.set_columns(state, header, header_end, text_column, title_column)
+
+    header = state['header']
+    text_index = header.index(state['text_column'])
+    title_index = header.index(state['title_column'])
+
+    row_offset, byte_offset = checkpoint.resume_position(state)
+    if state['chunks']:
+        print(f"  -> Melanjutkan {file_name} dari baris {row_offset} (byte {byte_offset}), {total_docs} dokumen dari checkpoint.")
+
+    file_size = max(1, state['file_size'])
+    # Variabel untuk melacak progres terakhir yang dicetak (kelipatan 5%)
+    last_percentage_printed = int((byte_offset / file_size) * 100)
+
+    rows = iter_csv_rows(file_path, byte_offset)
+    while True:
+        batch = list(itertools.islice(rows, CHECKPOINT_CHUNK_ROWS))
+        if not batch:
+            break
 
-    text = str(text) 
-    text = text.lower()
-    text = re.sub(r'[^a-z\s]', ' ', text) # Ganti karakter non-huruf dengan spasi
-    text = re.sub(r'\s+', ' ', text).strip() # Hapus spasi ganda
+        row_numbers, raw_contents, raw_titles = [], [], []
+        for row_number, (row, _) in enumerate(batch, start=row_offset):
+            if not row:
+                continue # Baris kosong
+            if len(row) > len(header):
+                # Sama seperti on_bad_lines='warn': beri peringatan, lewati baris korup
+                print(f"  [PERINGATAN] Baris {row_number + 1} di {file_name} korup ({len(row)} kolom). Melewati.")
+                continue
+            row_numbers.append(row_number)
+            raw_contents.append(row[text_index] if len(row) > text_index else "")
+            raw_titles.append(row[title_index] if len(row) > title_index else "")
+
+        # Preprocessing (bulk). Judul ikut di-preprocess sekali di sini untuk field judul di VSM;
+        # jika file tidak punya kolom judul (judul = konten), field judul dikosongkan.
+        clean_contents = normalizer.normalize_many(raw_contents)
+        if state['title_column'] != state['text_column']:
+            clean_titles = normalizer.normalize_many(raw_titles)
+        else:
+            clean_titles = [""] * len(raw_titles)
 
-    # Stemming
-    stemmed_text = stemmer.stem(text)
+        chunk_records = []
+        for row_number, raw_content, raw_title, clean_content, clean_title in zip(row_numbers, raw_contents, raw_titles, clean_contents, clean_titles):
+            # Simpan data hanya jika konten bersih tidak kosong
+            if not clean_content:
+                continue
 
-    tokens = stemmed_text.split()
-    # Stopword Removal
-    tokens = [word for word in tokens if word not in stop_words and len(word) > 1]
-    
-    return " ".join(tokens)
+            # Ambil Judul
+            title = raw_title if raw_title else placeholder_title(source, row_number)
 
-def collect_documents():
-    """Mengumpulkan dan memproses dokumen dari semua file dataset CSV."""
-    global df_documents
-    data = []
-    doc_id_counter = 0
+            chunk_records.append({
+                'title': title.strip().title(),
+                'source': source,
+                'raw_content': raw_content,
+                'clean_content': clean_content,
+                'clean_title': clean_title
+            })
+
+        byte_end = batch[-1][1]
+        checkpoint.commit_chunk(state, chunk_records, row_offset, row_offset + len(batch), byte_offset, byte_end)
+        total_docs += len(chunk_records)
+        row_offset, byte_offset = row_offset + len(batch), byte_end
+
+        # --- LOGIKA PROGRESS BAR (MENCETAK KELIPATAN 5%, berdasarkan posisi byte) ---
+        current_percentage = int((byte_offset / file_size) * 100)
+        if current_percentage >= last_percentage_printed + 5:
+            last_percentage_printed = current_percentage
+            # Mencetak progres menggunakan print biasa (tidak menimpa baris)
+            print(f"  -> Progress {file_name}: {row_offset} baris ({current_percentage}%)", flush=True)
+
+    checkpoint.mark_completed(state)
+    print(f"  -> Progress {file_name}: Selesai ({row_offset} baris, {total_docs} dokumen).") # Baris baru setelah selesai
+    return total_docs
+
+def placeholder_title(source, row_number):
+    """Judul pengganti untuk baris tanpa judul (tidak ikut di-index sebagai field judul)."""
+    return f"{source} Doc {row_number+1}"
+
+def iter_document_field(checkpoint, sources, field):
+    """
+    Membaca satu field record (misal 'clean_content') dari chunk checkpoint di disk, urut doc_id.
+    Hanya satu chunk yang berada di memori, sehingga teks korpus tidak perlu dimuat seluruhnya.
+    """
+    for source in sources:
+        state = checkpoint.read_state(source)
+        for records in checkpoint.iter_chunks(state):
+            for record in records:
+                yield record[field]
+
+def collect_documents(checkpoint=None, profiler=None):
+    """
+    Mengumpulkan dan memproses dokumen dari semua file dataset CSV ke checkpoint ingestion.
+    Mengembalikan DataFrame metadata dokumen (doc_id, title, source, category), atau None jika gagal.
+    Teks dokumen (raw_content, clean_content, clean_title) tetap di chunk checkpoint di disk
+    dan dibaca per chunk dengan iter_document_field.
+    """
+    if checkpoint is None:
+        checkpoint = IngestCheckpoint(CHECKPOINT_DIR)
+    profiler = profiler or PipelineProfiler(enabled=False)
+    sources, doc_counts = [], []
 
     print("Mulai mengumpulkan dan memproses dokumen dari file CSV...")
     
     if not os.path.exists(dataset_PATH):
         print(f"Error: Direktori '{dataset_PATH}/' tidak ditemukan.")
-        return False
-        
-    # --- PENTING: KOLOM TEXT DAN JUDUL ANDA ---
-    # Ganti 'konten' dan 'judul' jika nama kolom di CSV Anda berbeda.
-    TEXT_COLUMN_CANDIDATES = ['konten', 'judul', 'content', 'text', 'abstract', 'body']
-    # -------------------------------------------------------------------
+        return None
         
     total_files = len(DATASET_FILES)
     files_processed = 0
@@ -87,76 +286,10 @@ def collect_documents():
         print(f"  -> Memproses dataset: {file_name}...")
         
         try:
-            # --- PERBAIKAN KRITIS: Menghapus low_memory=False karena tidak didukung engine='python' ---
-            df_temp = pd.read_csv(
-                file_path, 
-                sep=',', 
-                encoding='latin1', 
-                engine='python',
-                on_bad_lines='warn', # Memberikan peringatan jika ada baris korup, tapi tidak menghentikan
-            ) 
-            
-            # 1. Mencari kolom teks utama (Konten)
-            text_column = None
-            for col in TEXT_COLUMN_CANDIDATES:
-                if col in df_temp.columns and len(df_temp[col].dropna()) > 0:
-                    text_column = col
-                    break
-
-            if text_column is None:
-                print(f"  [SKIPPED] Tidak ditemukan kolom teks relevan di {file_name}")
-                files_processed += 1
-                continue
-            
-            # 2. Mencari kolom Judul
-            title_column = 'judul' if 'judul' in df_temp.columns else (
-                'title' if 'title' in df_temp.columns else text_column
-            )
-            
-            # Inisialisasi progress bar per file
-            total_rows = len(df_temp)
-            rows_counter = 0
-            
-            # Variabel untuk melacak progres terakhir yang dicetak (kelipatan 5%)
-            last_percentage_printed = -5 
-
-            # Iterasi per baris (dokumen)
-            for index, row in df_temp.iterrows():
-                # Pastikan konten teks ada (tidak NaN)
-                raw_content = str(row[text_column]) if pd.notna(row[text_column]) else ""
-                
-                # Ambil Judul
-                title = str(row[title_column]) if pd.notna(row[title_column]) else f"{source} Doc {index+1}"
-
-                # Preprocessing
-                clean_content = preprocess_text(raw_content)
-                
-                # Simpan data hanya jika konten bersih tidak kosong
-                if clean_content:
-                    data.append({
-                        'doc_id': doc_id_counter,
-                        'title': title.strip().title(), 
-                        'source': source,
-                        'raw_content': raw_content,
-                        'clean_content': clean_content
-                    })
-                    doc_id_counter += 1
-                
-                rows_counter += 1
-                
-                # --- LOGIKA PROGRESS BAR (MENCETAK KELIPATAN 5%) ---
-                current_percentage = int((rows_counter / total_rows) * 100)
-                
-                # Cek apakah persentase saat ini adalah kelipatan 5% yang belum dicetak, atau sudah baris terakhir
-                if current_percentage >= last_percentage_printed + 5 or rows_counter == total_rows:
-                    if rows_counter != total_rows:
-                        last_percentage_printed = current_percentage
-                        
-                    # Mencetak progres menggunakan print biasa (tidak menimpa baris)
-                    print(f"  -> Progress {file_name}: {rows_counter}/{total_rows} ({current_percentage}%)", flush=True)
-
-
-            print(f"  -> Progress {file_name}: Selesai ({total_rows} dokumen).") # Baris baru setelah selesai
+            total_docs = ingest_dataset_file(file_name, file_path, source, checkpoint)
+            if total_docs:
+                sources.append(source)
+                doc_counts.append(total_docs)
 
         except Exception as e:
             print(f"\nGagal membaca/memproses file {file_path}: {e}")
@@ -166,40 +299,48 @@ def collect_documents():
         total_percentage = (files_processed / total_files) * 100
         print(f"  -> [TOTAL PROGRESS DATASET: {files_processed}/{total_files} ({total_percentage:.0f}%)]")
 
-    if not data:
+    if not sources:
         print("Error: Tidak ada dokumen yang berhasil dimuat.")
-        return False
-
-    df_documents = pd.DataFrame(data)
+        return None
+
+    # Hanya metadata yang dibutuhkan untuk scoring, filter & tampilan hasil yang disimpan di memori
+    df_documents = pd.DataFrame({
+        'doc_id': range(sum(doc_counts)),
+        'title': list(iter_document_field(checkpoint, sources, 'title')),
+        'source': np.repeat(sources, doc_counts),
+    })
+    df_documents['category'] = df_documents['source'].map(lambda source: SOURCE_CATEGORIES.get(source, source))
+    profiler.record_structure("df_documents (DataFrame)", df_documents)
     print(f"\nTotal {len(df_documents)} dokumen berhasil dimuat dan diproses.")
-    return True
+    return df_documents
 
 # --- FASE II: INDEXING (WHOOSH) ---
 def create_whoosh_schema():
     """Mendefinisikan skema untuk Whoosh Index."""
     return Schema(
         doc_id=ID(stored=True, unique=True),
-        title=STORED, 
+        title=TEXT(stored=True),
         source=STORED, 
         clean_content=TEXT(stored=True) 
     )
 
-def index_documents():
-    """Membuat Whoosh Index dari dokumen yang sudah diproses."""
-    global doc_contents
-
-    if df_documents.empty:
+def index_documents(df_documents, index_dir, doc_contents):
+    """
+    Membuat Whoosh Index dari dokumen yang sudah diproses di direktori `index_dir`.
+    `doc_contents` adalah iterable konten bersih yang sejajar dengan baris df_documents.
+    """
+    if df_documents is None or df_documents.empty:
         print("Dataframe dokumen kosong. Silakan jalankan Load Dataset terlebih dahulu.")
-        return
+        return False
 
-    print(f"\nMembuat Whoosh Index di direktori: {INDEX_DIR}")
+    print(f"\nMembuat Whoosh Index di direktori: {index_dir}")
 
     # 1. Persiapan Index
     schema = create_whoosh_schema()
-    if not os.path.exists(INDEX_DIR):
-        os.mkdir(INDEX_DIR)
+    if not os.path.exists(index_dir):
+        os.makedirs(index_dir)
         
-    ix = create_in(INDEX_DIR, schema)
+    ix = create_in(index_dir, schema)
     writer = ix.writer()
     
     # 2. Menulis Dokumen
@@ -207,16 +348,17 @@ def index_documents():
     
     total_docs = len(df_documents)
     
-    for index, row in df_documents.iterrows():
+    rows = zip(df_documents['doc_id'], df_documents['title'], df_documents['source'], doc_contents)
+    for index, (doc_id, title, source, clean_content) in enumerate(rows):
         try:
             writer.add_document(
-                doc_id=str(row['doc_id']),
-                title=row['title'],
-                source=row['source'],
-                clean_content=row['clean_content']
+                doc_id=str(doc_id),
+                title=title,
+                source=source,
+                clean_content=clean_content
             )
         except Exception as e:
-            print(f"Gagal meng-index dokumen {row['doc_id']} ({row['title']}): {e}")
+            print(f"Gagal meng-index dokumen {doc_id} ({title}): {e}")
             
         # Tampilkan progress bar Whoosh Indexing (diperbarui setiap 5000 dokumen atau pada akhir)
         # Menggunakan \r dan end="" di sini karena total dokumen sudah fix dan lebih stabil
@@ -228,118 +370,402 @@ def index_documents():
     writer.commit()
     end_time = time.time()
     print(f"\rIndexing Whoosh selesai dalam {end_time - start_time:.2f} detik. Total {total_docs} dokumen di-index.")
-    
-    # 3. Persiapan untuk VSM (BoW)
-    doc_contents = df_documents['clean_content'].tolist()
-    print("Data konten bersih siap untuk BoW.")
+    return True
 
 # --- FASE III & IV: VSM, SEARCH & RANKING ---
-def prepare_vsm():
-    """Membuat Matriks Bag-of-Words (BoW) untuk perhitungan Cosine Similarity."""
-    global vectorizer, doc_term_matrix
-
-    if not doc_contents:
-        print("Konten dokumen kosong. Pastikan indexing sudah dilakukan.")
-        return False
-
-    print("\nMembuat Matriks Bag-of-Words (BoW) dengan CountVectorizer...")
+def prepare_vsm(doc_contents, generation_path, vsm_mode=None, doc_titles=None, profiler=None):
+    """
+    Membuat Matriks Bag-of-Words (BoW) untuk perhitungan Cosine Similarity.
+    Mode "count" memakai CountVectorizer (vocabulary di memori); mode "hashing" memproses
+    `doc_contents` secara streaming ke ruang fitur hash dan menulis blok CSR ke disk.
+    Jika `doc_titles` diisi, dibuat juga matriks judul dengan vocabulary (kolom) yang sama.
+    Mengembalikan (vectorizer, doc_term_matrix, doc_norms, title_matrix, title_norms), atau None jika gagal.
+    """
+    vsm_mode = vsm_mode or VSM_MODE
+    profiler = profiler or PipelineProfiler(enabled=False)
     start_time = time.time()
+
+    if vsm_mode == index_store.VSM_MODE_HASHING:
+        print(f"\nMembuat Matriks BoW out-of-core dengan HashingVectorizer ({HASHING_N_FEATURES} fitur)...")
+        vectorizer = hashing_vsm.create_hashing_vectorizer(HASHING_N_FEATURES)
+        doc_term_matrix, doc_norms = hashing_vsm.build_hashed_matrix(
+            doc_contents,
+            os.path.join(generation_path, index_store.HASHED_SUBDIR),
+            vectorizer,
+            block_size=HASHING_BLOCK_DOCS,
+            term_table=HASHING_TERM_TABLE,
+        )
+        if doc_term_matrix.shape[0] == 0:
+            print("Konten dokumen kosong. Pastikan indexing sudah dilakukan.")
+            return None
+
+        title_matrix, title_norms = None, None
+        if doc_titles is not None:
+            # Ruang fitur hash otomatis sama untuk konten dan judul
+            title_matrix, title_norms = hashing_vsm.build_hashed_matrix(
+                doc_titles,
+                os.path.join(generation_path, index_store.HASHED_TITLE_SUBDIR),
+                vectorizer,
+                block_size=HASHING_BLOCK_DOCS,
+            )
+    else:
+        print("\nMembuat Matriks Bag-of-Words (BoW) dengan CountVectorizer...")
+        # Konten dibaca sekali secara streaming (tanpa list di memori); jumlahnya dihitung sambil jalan
+        total_docs = 0
+        def count_docs(docs):
+            nonlocal total_docs
+            for doc in docs:
+                total_docs += 1
+                yield doc
+
+        vectorizer = CountVectorizer()
+        title_matrix, title_norms = None, None
+        try:
+            if doc_titles is None:
+                doc_term_matrix = vectorizer.fit_transform(count_docs(doc_contents))
+            else:
+                # Satu fit untuk konten + judul: vocabulary bersama, lalu baris dipisah per field
+                combined = vectorizer.fit_transform(itertools.chain(count_docs(doc_contents), doc_titles)).tocsr()
+                doc_term_matrix, title_matrix = combined[:total_docs], combined[total_docs:]
+                title_norms = np.sqrt(title_matrix.multiply(title_matrix).sum(axis=1)).A1
+        except ValueError as e: # Vocabulary kosong
+            print(f"Konten dokumen kosong. Pastikan indexing sudah dilakukan. ({e})")
+            return None
+        doc_norms = np.sqrt(doc_term_matrix.multiply(doc_term_matrix).sum(axis=1)).A1
     
-    vectorizer = CountVectorizer()
-    doc_term_matrix = vectorizer.fit_transform(doc_contents)
-    
+    profiler.record_structure("doc_term_matrix (CSR)", doc_term_matrix)
+    if title_matrix is not None:
+        profiler.record_structure("title_matrix (CSR)", title_matrix)
+
     end_time = time.time()
     print(f"BoW Matrix (TD-Matrix) dibuat ({doc_term_matrix.shape[0]} doks, {doc_term_matrix.shape[1]} terms) dalam {end_time - start_time:.2f} detik.")
-    return True
-
-def search_and_rank(query_text, top_k=5):
-    """Melakukan pencarian Whoosh dan ranking Cosine Similarity."""
-    if df_documents.empty or vectorizer is None or doc_term_matrix is None:
-        print("\n[PERINGATAN] Sistem belum siap. Silakan jalankan menu [1] terlebih dahulu.")
-        return
-
+    return vectorizer, doc_term_matrix, doc_norms, title_matrix, title_norms
+
+def search_page(query_text=None, cursor=None, page_size=PAGE_SIZE, filters=None):
+    """
+    Pencarian dengan pagination. Query baru: isi `query_text`; halaman berikutnya: isi `cursor`
+    (dari hasil sebelumnya). Halaman berikutnya di-slice dari sesi tanpa scoring ulang.
+    `filters` membatasi dokumen sebelum scoring, misal {'category': 'tesis'} atau {'source': ['kompas', 'tempo']}.
+    Mengembalikan dict {'query', 'results', 'next_cursor', 'total_docs'}, atau None jika gagal.
+    """
+    if cursor is not None:
+        session_id, offset = parse_cursor(cursor)
+        session = session_store.get(session_id)
+        if session is None:
+            print("\n[PERINGATAN] Sesi pencarian sudah kedaluwarsa (atau index sudah diperbarui). Silakan ulangi query.")
+            return None
+    else:
+        # Ambil snapshot sekali di awal: jika build background melakukan swap di tengah query,
+        # halaman pertama tetap dihitung seluruhnya dari generation snapshot ini. Cursor halaman
+        # berikutnya hanya berlaku selama generation ini aktif: saat swap sesinya dibuang (lihat
+        # activate_index), dan query yang selesai setelah swap tidak menyimpan sesi sama sekali.
+        index = active_index
+        if index is None:
+            print("\n[PERINGATAN] Sistem belum siap. Silakan jalankan menu [1] terlebih dahulu.")
+            return None
+
+        query_terms, query_vector = analyze_query(index, query_text)
+        if not query_terms:
+            print("Query setelah diproses kosong. Coba gunakan kata kunci yang lebih spesifik.")
+            return None
+
+        selection = None
+        if filters:
+            selection = index.filter_index.select(filters)
+            if selection.size == 0:
+                print(f"\n[PERINGATAN] Tidak ada dokumen yang cocok dengan filter {filters}.")
+
+        print_spelling_suggestions(index, query_text)
+
+        session = session_store.create(index, query_text, query_vector, selection)
+        offset = 0
+
+    # Top-k Cosine Similarity (skor > 0), dihitung paralel per blok baris matriks
+    ranked_indices, similarity_scores, has_more = session_store.get_page(session, offset, page_size)
+    df_documents = session.index.df_documents
+
+    results = []
+    for rank, (doc_index, score) in enumerate(zip(ranked_indices, similarity_scores), start=offset + 1):
+        doc_data = df_documents.iloc[doc_index]
+        results.append({
+            'rank': rank,
+            'score': score,
+            'title': doc_data['title'],
+            'source': doc_data['source'],
+            'doc_id': doc_data['doc_id']
+        })
+
+    return {
+        'query': session.query_text,
+        'results': results,
+        'next_cursor': make_cursor(session.session_id, offset + page_size) if has_more else None,
+        'total_docs': session.selection.size if session.selection is not None else len(df_documents),
+    }
+
+def print_results(results):
+    """Mencetak satu halaman hasil pencarian."""
+    first_rank, last_rank = results[0]['rank'], results[-1]['rank']
+    header = f"TOP {last_rank}" if first_rank == 1 else f"{first_rank}-{last_rank}"
+    print(f"\n=== {header} HASIL PENCARIAN (Cosine Similarity) ===")
+    for res in results:
+        print(f"[{res['rank']}] Skor: {res['score']:.4f} | Judul: {res['title']} ({res['source']}) | ID: {res['doc_id']}")
+    print("===================================================")
+
+def search_and_rank(query_text, top_k=5, filters=None):
+    """Melakukan pencarian dan ranking Cosine Similarity (halaman pertama). Mengembalikan cursor halaman berikutnya."""
     print("\n--- PROSES PENCARIAN & RANKING ---")
-    
-    clean_query = preprocess_text(query_text)
-    if not clean_query:
-        print("Query setelah diproses kosong. Coba gunakan kata kunci yang lebih spesifik.")
-        return
 
-    query_vector = vectorizer.transform([clean_query])
-    similarity_scores = cosine_similarity(query_vector, doc_term_matrix).flatten()
-    ranked_indices = np.argsort(similarity_scores)[::-1]
-    
-    top_results_data = []
-    
-    for rank, doc_index in enumerate(ranked_indices):
-        score = similarity_scores[doc_index]
-        if score > 0 and len(top_results_data) < top_k:
-            doc_data = df_documents.iloc[doc_index]
-            top_results_data.append({
-                'rank': len(top_results_data) + 1,
-                'score': score,
-                'title': doc_data['title'],
-                'source': doc_data['source'],
-                'doc_id': doc_data['doc_id']
-            })
-        elif len(top_results_data) >= top_k:
-            break
+    page = search_page(query_text, page_size=top_k, filters=filters)
+    if page is None:
+        return None
 
-    print(f"Ditemukan {len(top_results_data)} dokumen relevan (dari {len(df_documents)} total).")
+    top_results_data = page['results']
+    print(f"Ditemukan {len(top_results_data)} dokumen relevan (dari {page['total_docs']} total).")
     
     if top_results_data:
-        print("\n=== TOP 5 HASIL PENCARIAN (Cosine Similarity) ===")
-        for res in top_results_data:
-            print(f"[{res['rank']}] Skor: {res['score']:.4f} | Judul: {res['title']} ({res['source']}) | ID: {res['doc_id']}")
-        print("===================================================")
+        print_results(top_results_data)
     else:
         print("\nTidak ada dokumen yang relevan ditemukan dengan query Anda (Skor = 0).")
+    return page['next_cursor']
+
+
+def analyze_query(index, query_text):
+    """
+    Preprocessing query menjadi (list term, vektor query sparse).
+    Fast path: lookup kata -> kolom vocabulary yang dibuat saat build (Sastrawi hanya untuk kata baru).
+    """
+    return index.query_analyzer.analyze(query_text, normalizer)
+
+def print_spelling_suggestions(index, query_text):
+    """Menampilkan saran ejaan (dari kata permukaan korpus) untuk kata query yang tidak dikenal index."""
+    for word in index.query_analyzer.unknown_words(query_text, normalizer):
+        suggestions = index.typeahead.suggest(word, limit=SPELLING_SUGGESTIONS)
+        if suggestions:
+            print(f"[SARAN] '{word}' tidak ada di index. Mungkin maksud Anda: {', '.join(term for term, _ in suggestions)}")
+        else:
+            print(f"[SARAN] '{word}' tidak ada di index.")
+
+def complete_query_word(text, state):
+    """Completer readline: melengkapi kata yang sedang diketik dari vocabulary index aktif."""
+    index = active_index
+    if index is None:
+        return None
+    matches = [term for term, _ in index.typeahead.complete(text)]
+    return matches[state] if state < len(matches) else None
+
+
+# --- BUILD INDEX (BACKGROUND + GENERATION SWAP) ---
+def build_index_generation():
+    """
+    Membangun index lengkap ke generation baru, memverifikasinya, lalu menukar pointer CURRENT.
+    Generation aktif tidak disentuh selama build, sehingga pencarian tetap bisa berjalan.
+    Jika build gagal, generation setengah jadi dihapus dan index aktif tidak berubah;
+    checkpoint ingestion tetap disimpan sehingga build berikutnya melanjutkan dari chunk terakhir.
+    """
+    generation_name, generation_path = index_store.create_generation_dir(INDEX_DIR)
+    print(f"\n[BUILD] Membangun generation baru: {generation_name}")
+
+    checkpoint = IngestCheckpoint(CHECKPOINT_DIR)
+    profiler = PipelineProfiler(PROFILE_BUILD, PROFILE_DIR, generation_name)
+    profiler.start()
+
+    try:
+        with profiler.phase("collect_documents") as phase:
+            df_documents = collect_documents(checkpoint, profiler)
+            if df_documents is None:
+                raise ValueError("Tidak ada dokumen yang berhasil dimuat.")
+            phase['docs'] = profiler.total_docs = len(df_documents)
+        total_docs = len(df_documents)
+
+        # Teks dokumen dibaca ulang per chunk dari checkpoint untuk setiap tahap (tidak pernah utuh di memori)
+        stream = functools.partial(iter_document_field, checkpoint, list(pd.unique(df_documents['source'])))
+
+        with profiler.phase("index_documents", total_docs):
+            if not index_documents(df_documents, os.path.join(generation_path, index_store.WHOOSH_SUBDIR), stream('clean_content')):
+                raise ValueError("Indexing Whoosh gagal.")
+
+        with profiler.phase("prepare_vsm", total_docs):
+            vsm = prepare_vsm(stream('clean_content'), generation_path, VSM_MODE, stream('clean_title'), profiler)
+            if vsm is None:
+                raise ValueError("Pembuatan matriks BoW gagal.")
+            vectorizer, doc_term_matrix, doc_norms, title_matrix, title_norms = vsm
+
+        with profiler.phase("lookup_tables", total_docs):
+            # Tabel kata permukaan -> stem -> kolom untuk fast path query (dari teks mentah konten & judul)
+            query_analyzer = QueryAnalyzer.build(
+                itertools.chain(stream('raw_content'), df_documents['title']), normalizer, vectorizer
+            )
+            query_analyzer.save(generation_path)
+            build_typeahead(query_analyzer, doc_term_matrix, title_matrix, stream).save(generation_path)
+            FilterIndex.build(df_documents, FILTER_FIELDS).save(generation_path)
+
+        with profiler.phase("save_generation", total_docs):
+            index_store.save_generation(generation_path, df_documents, vectorizer, doc_term_matrix, doc_norms, VSM_MODE, title_matrix, title_norms)
+
+        # Verifikasi: muat ulang dari disk sebelum dinyatakan aktif
+        with profiler.phase("load_generation", total_docs):
+            new_index = index_store.load_generation(INDEX_DIR, generation_name)
+    except Exception as e:
+        shutil.rmtree(generation_path, ignore_errors=True)
+        print(f"\n[BUILD GAGAL] {e}. Index aktif tidak berubah.")
+        return False
+    finally:
+        # Report tetap ditulis jika build gagal (berisi fase-fase sampai titik gagal)
+        profiler.stop()
+        profiler.print_summary()
+
+    index_store.swap_current(INDEX_DIR, generation_name)
+    activate_index(new_index)
+    # Build selesai: checkpoint tidak diperlukan lagi (build berikutnya membaca dataset dari awal)
+    checkpoint.clear()
+
+    removed = index_store.collect_garbage(INDEX_DIR, keep=KEEP_GENERATIONS)
+    if removed:
+        print(f"[BUILD] Generation lama dihapus: {', '.join(removed)}")
+    print(f"\n[SUKSES] Generation {generation_name} aktif ({len(new_index.df_documents)} dokumen). Siap mencari.")
+    return True
+
+def build_typeahead(query_analyzer, doc_term_matrix, title_matrix, stream):
+    """
+    Membuat typeahead dari kata permukaan korpus, diurutkan dengan DF stem-nya (jumlah dokumen
+    yang memuat stem di konten atau judul). Mode count: DF per kolom vocabulary dari matriks CSR.
+    Mode hashing: kolom hash bisa bertabrakan, jadi DF stem dihitung dari konten & judul bersih
+    yang dibaca per chunk lewat `stream(field)`.
+    """
+    stems = query_analyzer.stems
+    if VSM_MODE == index_store.VSM_MODE_HASHING:
+        counts = {}
+        for content, title in zip(stream('clean_content'), stream('clean_title')):
+            for term in set(content.split()) | set(title.split()):
+                counts[term] = counts.get(term, 0) + 1
+        stem_doc_freqs = [counts.get(stem, 0) for stem in stems]
+    else:
+        if title_matrix is not None:
+            doc_term_matrix = (doc_term_matrix + title_matrix).tocsr()
+        column_doc_freqs = np.bincount(doc_term_matrix.indices, minlength=doc_term_matrix.shape[1])
+        stem_doc_freqs = [column_doc_freqs[column] if column >= 0 else 0 for column in query_analyzer.columns]
+    return Typeahead.from_query_analyzer(query_analyzer, stem_doc_freqs, TYPEAHEAD_TOP_N)
+
+def activate_index(new_index):
+    """Menyiapkan scorer (pecah matriks per blok baris) lalu menjadikan generation aktif (swap referensi)."""
+    global active_index
+
+    n_blocks = choose_n_blocks(new_index.doc_term_matrix.shape[0], SCORING_THREADS, SCORING_MIN_BLOCK_ROWS)
+    extra_fields = []
+    if new_index.title_matrix is not None:
+        extra_fields.append((new_index.title_matrix, new_index.title_norms, FIELD_WEIGHTS.get('title', 0)))
+    new_index.scorer = BlockScorer(
+        new_index.doc_term_matrix, new_index.doc_norms, scoring_executor, n_blocks,
+        field_weight=FIELD_WEIGHTS.get('content', 1.0), extra_fields=extra_fields,
+    )
+    active_index = new_index
+    # Sesi pagination milik generation lama dibuang agar generation lama bisa dibebaskan dari memori
+    session_store.set_active_generation(new_index.name)
+
+def start_background_build():
+    """Menjalankan build_index_generation di thread background (jika belum ada yang berjalan)."""
+    global build_thread
+
+    with build_lock:
+        if build_thread is not None and build_thread.is_alive():
+            print("\n[INFO] Build index masih berjalan di background. Tunggu hingga selesai.")
+            return False
+        build_thread = threading.Thread(target=build_index_generation, name="index-build", daemon=True)
+        build_thread.start()
+    return True
+
+def load_current_index():
+    """Memuat generation aktif (pointer CURRENT) dari disk. Mengembalikan True jika berhasil."""
+    generation_name = index_store.read_current(INDEX_DIR)
+    if generation_name is None:
+        return False
+
+    activate_index(index_store.load_generation(INDEX_DIR, generation_name))
+    # Bersihkan sisa build yang terputus (misal program dihentikan saat build)
+    index_store.collect_garbage(INDEX_DIR, keep=KEEP_GENERATIONS)
+    return True
 
 
 # --- CLI INTERFACE ---
 def load_and_index_process():
-    """Handler untuk menu [1] Load & Index Dataset."""
-    if collect_documents():
-        index_documents()
-        prepare_vsm()
-        print("\n[SUKSES] Sistem siap untuk melakukan pencarian. Silakan pilih menu [2].")
+    """Handler untuk menu [1] Load & Index Dataset (berjalan di background)."""
+    if start_background_build():
+        print("\n[INFO] Build index dimulai di background. Pencarian tetap bisa dilakukan dengan index aktif.")
 
 def search_query_process():
     """Handler untuk menu [2] Search Query."""
-    if df_documents.empty or vectorizer is None or doc_term_matrix is None:
+    if active_index is None:
         print("\n[PERINGATAN] Sistem belum siap. Silakan jalankan menu [1] terlebih dahulu.")
         return
 
+    if readline is not None:
+        readline.set_completer(complete_query_word)
+        readline.parse_and_bind("tab: complete")
+        print("(Tekan TAB untuk saran kata dari index)")
+
     query = input("\nMasukkan Query Pencarian Anda: ")
-    if query:
-        search_and_rank(query, top_k=5)
-    else:
+    if not query:
         print("Query tidak boleh kosong.")
+        return
+
+    filters = parse_filter_input(input("Filter sumber (kosong = semua, contoh: tesis / berita / kompas,tempo): "))
+    cursor = search_and_rank(query, top_k=PAGE_SIZE, filters=filters)
+    while cursor is not None:
+        choice = input("\n[N] Halaman berikutnya | [Enter] Kembali ke menu: ")
+        if choice.strip().lower() != 'n':
+            break
+
+        page = search_page(cursor=cursor, page_size=PAGE_SIZE)
+        if page is None:
+            break
+        if page['results']:
+            print_results(page['results'])
+        else:
+            print("Tidak ada hasil lagi.")
+        cursor = page['next_cursor']
+
+
+def parse_filter_input(text):
+    """
+    Mengubah input filter CLI menjadi dict filter. Setiap kata dicocokkan ke kategori
+    (tesis/berita) atau nama source (etd_usk, kompas, ...). Kosong = tanpa filter.
+    """
+    filters = {}
+    categories = set(SOURCE_CATEGORIES.values())
+    for value in text.replace(',', ' ').lower().split():
+        field = 'category' if value in categories else 'source'
+        filters.setdefault(field, []).append(value)
+    return filters or None
+
+
+def get_status():
+    """Teks status sistem untuk menu utama."""
+    building = build_thread is not None and build_thread.is_alive()
+    if active_index is None:
+        return "Indexing Berjalan..." if building else "Perlu Indexing"
+    status = f"Siap Mencari ({active_index.name})"
+    return status + " | Build baru berjalan..." if building else status
 
 
 def main_cli():
     """Fungsi Utama CLI."""
     
-    if os.path.exists(INDEX_DIR) and os.path.isdir(INDEX_DIR):
-        print(f"Index Whoosh ditemukan di '{INDEX_DIR}'. Memuat data...")
+    if index_store.read_current(INDEX_DIR) is not None:
+        print(f"Index ditemukan di '{INDEX_DIR}'. Memuat data...")
         try:
-            if collect_documents():
-                 prepare_vsm()
-                 print("[READY] Sistem dimuat dari data yang sudah ada. Siap mencari.")
-            else:
-                print("Gagal memuat dokumen meskipun index ada. Silakan jalankan [1].")
-
+            load_current_index()
+            print(f"[READY] Sistem dimuat dari generation {active_index.name}. Siap mencari.")
         except Exception as e:
             print(f"Error saat memuat index/data: {e}. Silakan jalankan menu [1] untuk buat ulang.")
             
     else:
-        print("[INFO] Index Whoosh belum ditemukan. Silakan jalankan menu [1] untuk membuat index.")
+        print("[INFO] Index belum ditemukan. Silakan jalankan menu [1] untuk membuat index.")
 
 
     while True:
         print("\n" + "=" * 35)
         print("=== INFORMATION RETRIEVAL SYSTEM ===")
-        print(f"Status: {'Siap Mencari' if vectorizer is not None else 'Perlu Indexing'}")
+        print(f"Status: {get_status()}")
         print("=" * 35)
         print("[1] Load & Index Dataset")
         print("[2] Search Query")
@@ -360,4 +786,6 @@ def main_cli():
 
 
 if __name__ == "__main__":
+    if "--profile" in sys.argv[1:]:
+        PROFILE_BUILD = True
     main_cli()
@@ -0,0 +1,201 @@
+import os
+import sys
+import time
+import threading
+import numpy as np
+from scipy import sparse
+from concurrent.futures import ThreadPoolExecutor
+
+# --- SCORING PARALEL PER BLOK BARIS ---
+# Matriks dokumen-term dipecah menjadi beberapa blok baris saat index dimuat.
+# Satu query di-scoring ke semua blok secara paralel (operasi sparse SciPy/NumPy
+# melepas GIL), setiap blok mengembalikan top-k lokal, lalu hasilnya digabung.
+# Multi-field (konten + judul): setiap blok menghitung dot product semua field sekaligus.
+
+DEFAULT_MIN_BLOCK_ROWS = 50000 # Blok lebih kecil dari ini tidak sebanding dengan overhead thread
+
+
+def choose_n_blocks(total_docs, n_threads, min_block_rows=DEFAULT_MIN_BLOCK_ROWS):
+    """Jumlah blok = jumlah thread, tetapi setiap blok minimal `min_block_rows` baris."""
+    return max(1, min(n_threads, total_docs // max(1, min_block_rows)))
+
+
+def row_view(matrix, row_start, row_end):
+    """View CSR untuk baris [row_start, row_end) tanpa menyalin data/indices (aman untuk memory-map)."""
+    nnz_start, nnz_end = matrix.indptr[row_start], matrix.indptr[row_end]
+    return sparse.csr_matrix(
+        (
+            matrix.data[nnz_start:nnz_end],
+            matrix.indices[nnz_start:nnz_end],
+            np.asarray(matrix.indptr[row_start:row_end + 1]) - nnz_start,
+        ),
+        shape=(row_end - row_start, matrix.shape[1]),
+        copy=False,
+    )
+
+
+class BlockScorer:
+    """
+    Menghitung top-k Cosine Similarity sebuah query terhadap matriks dokumen yang dipecah per blok.
+    Jika ada field tambahan (misal judul), skor akhir adalah jumlah berbobot Cosine Similarity
+    tiap field (field tambahan = boost di atas skor konten), dihitung dalam pass yang sama per blok.
+    Dokumen tanpa isi di field tambahan (misal tanpa judul) tidak dirugikan: skor kontennya tetap utuh.
+
+    Parameters:
+        doc_term_matrix (csr_matrix): Matriks dokumen-term (field konten).
+        doc_norms (ndarray): Norma L2 tiap dokumen (precomputed).
+        executor (ThreadPoolExecutor, optional): Thread pool bersama. None = scoring 1 thread.
+        n_blocks (int): Jumlah blok baris (lihat choose_n_blocks). Default 1.
+        field_weight (float): Bobot field konten. Default 1.0.
+        extra_fields (list, optional): Field tambahan [(matrix, norms, weight), ...] dengan jumlah
+            baris dan vocabulary (kolom) yang sama dengan doc_term_matrix.
+    """
+
+    def __init__(self, doc_term_matrix, doc_norms, executor=None, n_blocks=1, field_weight=1.0, extra_fields=()):
+        self.executor = executor
+        self.doc_term_matrix = doc_term_matrix
+        self.doc_norms = doc_norms
+        self.total_docs = doc_term_matrix.shape[0]
+        # Buffer vektor query dense per thread pemanggil (mode hashing: 2^20 fitur = 8 MB),
+        # dipakai ulang antar query; hanya index yang disentuh query yang di-nol-kan kembali.
+        self._buffers = threading.local()
+
+        # Norma 0 (misal judul kosong) diganti 1: dot product-nya juga 0, jadi skor field tetap 0
+        self.fields = [(doc_term_matrix, doc_norms, field_weight)] + [
+            (matrix, np.where(norms > 0, norms, 1.0), weight)
+            for matrix, norms, weight in extra_fields if weight > 0
+        ]
+
+        boundaries = np.linspace(0, self.total_docs, max(1, n_blocks) + 1).astype(int)
+        self.blocks = [self._block(int(start), int(end)) for start, end in zip(boundaries[:-1], boundaries[1:])]
+
+    def top_k(self, query_vector, k, selection=None):
+        """
+        Mengembalikan (doc_indices, scores) untuk maksimal `k` dokumen dengan skor > 0,
+        terurut dari skor tertinggi (skor sama: doc index terkecil lebih dulu).
+        `selection` (doc_filters.DocSelection) membatasi dokumen yang di-scoring: rentang doc index
+        hanya menyentuh baris di rentang itu, mask diterapkan sebelum normalisasi & top-k.
+        """
+        query_vector = sparse.csr_matrix(query_vector)
+        query_norm = float(np.sqrt(query_vector.multiply(query_vector).sum()))
+        if query_norm == 0 or k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+
+        blocks = self._select_blocks(selection)
+        mask = selection.mask if selection is not None else None
+        if not blocks:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+
+        # Query dijadikan vektor dense agar perkalian memakai csr_matvec (cepat, tanpa alokasi sparse baru)
+        query_column = self._query_buffer(query_vector.shape[1])
+        query_column[query_vector.indices] = query_vector.data
+        try:
+            if self.executor is None or len(blocks) == 1:
+                partials = [self._score_block(block, query_column, query_norm, k, mask) for block in blocks]
+            else:
+                futures = [
+                    self.executor.submit(self._score_block, block, query_column, query_norm, k, mask)
+                    for block in blocks
+                ]
+                partials = [future.result() for future in futures]
+        finally:
+            query_column[query_vector.indices] = 0
+
+        doc_indices = np.concatenate([indices for indices, _ in partials])
+        scores = np.concatenate([block_scores for _, block_scores in partials])
+        order = np.lexsort((doc_indices, -scores))[:k]
+        return doc_indices[order], scores[order]
+
+    def _query_buffer(self, n_features):
+        """Buffer dense (berisi nol) milik thread pemanggil, dibuat sekali per thread."""
+        buffer = getattr(self._buffers, 'query_column', None)
+        if buffer is None or buffer.shape[0] != n_features:
+            buffer = np.zeros(n_features)
+            self._buffers.query_column = buffer
+        return buffer
+
+    def _block(self, row_start, row_end):
+        """Satu blok: (row_start, [view baris [row_start, row_end) untuk setiap field])."""
+        return row_start, [row_view(matrix, row_start, row_end) for matrix, _, _ in self.fields]
+
+    def _select_blocks(self, selection):
+        """Blok yang perlu di-scoring: semua blok, atau irisan blok dengan rentang filter."""
+        if selection is None or selection.ranges is None:
+            return self.blocks
+
+        blocks = []
+        for block_start, views in self.blocks:
+            block_end = block_start + views[0].shape[0]
+            for range_start, range_end in selection.ranges:
+                start, end = max(block_start, range_start), min(block_end, range_end)
+                if start < end:
+                    blocks.append(self._block(start, end))
+        return blocks
+
+    def _score_block(self, block, query_column, query_norm, k, mask=None):
+        """Top-k lokal satu blok. Hanya dokumen yang berbagi term dengan query yang dihitung skornya."""
+        row_start, views = block
+        dot_products = [view @ query_column for view in views]
+        if len(dot_products) == 1:
+            hits = np.flatnonzero(dot_products[0])
+        else:
+            hits = np.flatnonzero(np.logical_or.reduce([field_dots != 0 for field_dots in dot_products]))
+        if mask is not None:
+            hits = hits[mask[hits + row_start]]
+        if hits.size == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+
+        doc_indices = hits + row_start
+        scores = np.zeros(hits.size)
+        for field_dots, (_, norms, weight) in zip(dot_products, self.fields):
+            scores += weight * field_dots[hits] / norms[doc_indices]
+        scores /= query_norm
+        if hits.size > k:
+            # Simpan semua skor >= skor ke-k (termasuk yang seri) agar hasil gabungan tetap deterministik
+            kth_score = np.partition(scores, hits.size - k)[hits.size - k]
+            keep = np.flatnonzero(scores >= kth_score)
+            doc_indices, scores = doc_indices[keep], scores[keep]
+        return doc_indices, scores
+
+
+# --- BENCHMARK LATENSI (skala terhadap jumlah core) ---
+def benchmark(doc_term_matrix, doc_norms, thread_counts, n_queries=200, k=5, seed=42):
+    """Mengukur latensi p50/p99 satu query untuk setiap jumlah thread."""
+    rng = np.random.default_rng(seed)
+    # Query diambil dari beberapa term dokumen acak agar selalu ada hasil
+    queries = []
+    for doc_index in rng.integers(0, doc_term_matrix.shape[0], n_queries):
+        row = doc_term_matrix[doc_index]
+        terms = row.indices[:3] if row.nnz else np.array([0])
+        queries.append(sparse.csr_matrix((np.ones(len(terms)), terms, [0, len(terms)]), shape=(1, doc_term_matrix.shape[1])))
+
+    print(f"Matriks: {doc_term_matrix.shape[0]} doks x {doc_term_matrix.shape[1]} terms, nnz={doc_term_matrix.nnz}, {n_queries} query")
+    for n_threads in thread_counts:
+        executor = ThreadPoolExecutor(max_workers=n_threads) if n_threads > 1 else None
+        scorer = BlockScorer(doc_term_matrix, doc_norms, executor, n_blocks=n_threads)
+        scorer.top_k(queries[0], k) # pemanasan
+
+        latencies = []
+        for query_vector in queries:
+            start_time = time.perf_counter()
+            scorer.top_k(query_vector, k)
+            latencies.append((time.perf_counter() - start_time) * 1000)
+
+        if executor is not None:
+            executor.shutdown()
+        print(f"  -> {n_threads:>2} thread: p50 {np.percentile(latencies, 50):.2f} ms | p99 {np.percentile(latencies, 99):.2f} ms")
+
+
+if __name__ == "__main__":
+    # Contoh: python parallel_scoring.py 1000000 1,2,4,8
+    total_docs = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    thread_counts = [int(n) for n in sys.argv[2].split(',')] if len(sys.argv) > 2 else [1, 2, 4, os.cpu_count() or 1]
+
+    # Korpus sintetis: ~150 term unik per dokumen, distribusi term Zipf (mirip teks asli)
+    rng = np.random.default_rng(0)
+    n_terms, terms_per_doc = 200000, 150
+    term_ids = np.minimum(rng.zipf(1.3, total_docs * terms_per_doc), n_terms) - 1
+    rows = np.repeat(np.arange(total_docs), terms_per_doc)
+    matrix = sparse.csr_matrix((np.ones(len(rows)), (rows, term_ids)), shape=(total_docs, n_terms))
+    norms = np.sqrt(matrix.multiply(matrix).sum(axis=1)).A1
+    benchmark(matrix, norms, thread_counts)
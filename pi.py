@@ -1,14 +1,13 @@
 import os
 import sys
 import pandas as pd
-import re
 from whoosh.index import create_in, open_dir
 from whoosh.fields import Schema, TEXT, ID, STORED
-from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
 from sklearn.feature_extraction.text import CountVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 import time
+from text_normalizer import TextNormalizer
 
 # --- KONFIGURASI GLOBAL ---
 INDEX_DIR = "whoosh_index"
@@ -22,28 +21,15 @@ vectorizer = None
 doc_term_matrix = None
 doc_contents = [] 
 
-# Inisialisasi Sastrawi (Stemmer & Stopword Removal)
-stemmer = StemmerFactory().create_stemmer()
-from Sastrawi.StopWordRemover.StopWordRemoverFactory import StopWordRemoverFactory
-stopword_factory = StopWordRemoverFactory()
-stop_words = stopword_factory.get_stop_words()
+# Inisialisasi Normalizer (Stemming Sastrawi & Stopword Removal)
+# Instance yang sama dipakai untuk indexing dan query agar tokennya identik.
+normalizer = TextNormalizer(stem=True)
 
 
 # --- FASE I: PREPROCESSING ---
 def preprocess_text(text):
     """Melakukan Preprocessing Teks."""
-    if pd.isna(text) or text is None:
-        return ""
-
-    text = str(text) 
-    text = text.lower()
-    text = re.sub(r'[^a-z\s]', '', text)
-    stemmed_text = stemmer.stem(text)
-
-    tokens = stemmed_text.split()
-    tokens = [word for word in tokens if word not in stop_words and len(word) > 1]
-    
-    return " ".join(tokens)
+    return normalizer.normalize(text)
 
 def collect_documents():
     """Mengumpulkan dan memproses dokumen dari semua file dataset CSV."""
@@ -0,0 +1,300 @@
+import os
+import sys
+import json
+import mmap
+import time
+import tracemalloc
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+try:
+    import resource # Peak RSS (ru_maxrss); tidak tersedia di Windows
+except ImportError:
+    resource = None
+
+# --- PROFILING MEMORI & THROUGHPUT PIPELINE BUILD ---
+# Di setiap batas fase (collect_documents -> index_documents -> prepare_vsm -> ...) dicatat:
+#   - RSS proses (awal/akhir fase) dan peak RSS run sampai akhir fase,
+#   - memori Python yang ter-trace (tracemalloc): akhir fase dan peak selama fase,
+#   - lokasi kode dengan pertambahan alokasi terbesar (selisih snapshot tracemalloc),
+#   - waktu dan throughput (dokumen/detik).
+# Ukuran struktur data utama (DataFrame metadata, matriks CSR) dicatat
+# terpisah. Report ditulis ulang setelah setiap fase, sehingga jika proses di-OOM-kill,
+# report parsial sampai fase terakhir yang selesai tetap ada.
+# tracemalloc memperlambat build (~2-3x), jadi profiling hanya aktif jika diminta.
+
+REPORT_PREFIX = "profile_"
+DEFAULT_TOP_ALLOCATIONS = 5
+
+
+class PipelineProfiler:
+    """
+    Pencatat memori & throughput per fase build. Jika `enabled=False` semua method tidak
+    melakukan apa-apa, sehingga pemanggil tidak perlu memeriksa apakah profiling aktif.
+
+    Parameters:
+        enabled (bool): Aktifkan profiling.
+        report_dir (str, optional): Direktori report (profile_YYYYmmdd_HHMMSS_<run_name>.json).
+        run_name (str, optional): Nama run (misal nama generation), ikut dicatat di report.
+        top_allocations (int): Jumlah lokasi alokasi terbesar yang dicatat per fase.
+    """
+
+    def __init__(self, enabled=True, report_dir=None, run_name=None, top_allocations=DEFAULT_TOP_ALLOCATIONS):
+        self.enabled = enabled
+        self.report_dir = report_dir
+        self.run_name = run_name
+        self.top_allocations = top_allocations
+        self.phases = []
+        self.structures = []
+        self.total_docs = None
+        self.report_path = None
+        self._current_phase = None
+        self._snapshot = None
+        self._started_tracing = False
+        self._start_time = None
+        self._baseline_rss = None
+        self._peak_rss_before = None
+
+    def start(self):
+        """Mulai profiling (tracemalloc + baseline RSS)."""
+        if not self.enabled:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._snapshot = _take_snapshot()
+        self._start_time = time.time()
+        self._baseline_rss = current_rss()
+        self._peak_rss_before = peak_rss()
+        if self.report_dir:
+            os.makedirs(self.report_dir, exist_ok=True)
+            suffix = f"_{self.run_name}" if self.run_name else ""
+            self.report_path = os.path.join(self.report_dir, f"{REPORT_PREFIX}{time.strftime('%Y%m%d_%H%M%S')}{suffix}.json")
+
+    def stop(self):
+        """Menulis report akhir dan menghentikan tracemalloc (jika dimulai oleh profiler ini)."""
+        if not self.enabled:
+            return
+        self.write_report()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self._snapshot = None
+
+    @contextmanager
+    def phase(self, name, docs=None):
+        """
+        Context manager untuk satu fase. Yield dict record fase; jumlah dokumen yang diproses
+        bisa diisi belakangan lewat record['docs'] (misal setelah collect_documents selesai).
+        """
+        record = {'name': name, 'docs': docs}
+        if not self.enabled:
+            yield record
+            return
+
+        record['rss_start_bytes'] = current_rss()
+        tracemalloc.reset_peak()
+        self._current_phase = name
+        start_time = time.perf_counter()
+        try:
+            yield record
+        finally:
+            seconds = time.perf_counter() - start_time
+            traced_current, traced_peak = tracemalloc.get_traced_memory()
+            snapshot = _take_snapshot()
+
+            record.update({
+                'seconds': round(seconds, 3),
+                'docs_per_sec': round(record['docs'] / seconds, 1) if record['docs'] and seconds > 0 else None,
+                'rss_end_bytes': current_rss(),
+                'peak_rss_bytes': self._run_peak_rss(),
+                'traced_end_bytes': traced_current,
+                'traced_peak_bytes': traced_peak,
+                'top_allocations': _top_allocations(snapshot, self._snapshot, self.top_allocations),
+            })
+            self._snapshot = snapshot
+            self._current_phase = None
+            self.phases.append(record)
+            self.write_report()
+
+    def record_structure(self, name, obj):
+        """Mencatat perkiraan ukuran (bytes) satu struktur data di memori pada fase yang sedang berjalan."""
+        if not self.enabled:
+            return
+        self.structures.append({
+            'name': name,
+            'phase': self._current_phase,
+            'bytes': estimate_bytes(obj),
+            'items': int(obj.shape[0]) if hasattr(obj, 'shape') else len(obj),
+            'memory_mapped': _is_memory_mapped(obj),
+        })
+
+    def report(self):
+        """Report sebagai dict: peak memori, bytes per dokumen, dan detail per fase & struktur."""
+        total_docs = self.total_docs or max((phase['docs'] or 0 for phase in self.phases), default=0)
+        peak_phase = max(self.phases, key=lambda phase: phase['traced_peak_bytes'], default=None)
+        peak_rss_bytes = self._run_peak_rss()
+
+        def per_doc(value):
+            return round(value / total_docs) if value is not None and total_docs else None
+
+        # Pertumbuhan RSS di atas baseline (interpreter + library) = biaya memori yang skala dengan korpus
+        rss_growth = peak_rss_bytes - self._baseline_rss if None not in (peak_rss_bytes, self._baseline_rss) else None
+
+        return {
+            'run_name': self.run_name,
+            'started_at': time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self._start_time)) if self._start_time else None,
+            'total_seconds': round(time.time() - self._start_time, 3) if self._start_time else None,
+            'total_docs': total_docs,
+            'baseline_rss_bytes': self._baseline_rss,
+            'peak_rss_bytes': peak_rss_bytes,
+            'peak_rss_growth_bytes': rss_growth,
+            'peak_rss_growth_bytes_per_doc': per_doc(rss_growth),
+            'peak_traced_phase': peak_phase['name'] if peak_phase else None,
+            'peak_traced_bytes': peak_phase['traced_peak_bytes'] if peak_phase else None,
+            'peak_traced_bytes_per_doc': per_doc(peak_phase['traced_peak_bytes']) if peak_phase else None,
+            'phases': self.phases,
+            'structures': [
+                dict(structure, bytes_per_doc=per_doc(structure['bytes'])) for structure in self.structures
+            ],
+        }
+
+    def _run_peak_rss(self):
+        """
+        Peak RSS selama run ini. ru_maxrss adalah peak seumur proses (misal build sebelumnya di sesi
+        CLI yang sama), jadi dipakai hanya jika naik selama run; jika tidak, pakai sampel RSS tertinggi.
+        """
+        process_peak = peak_rss()
+        if process_peak is not None and (self._peak_rss_before is None or process_peak > self._peak_rss_before):
+            return process_peak
+        samples = [self._baseline_rss] + [
+            phase[key] for phase in self.phases for key in ('rss_start_bytes', 'rss_end_bytes')
+        ]
+        samples = [sample for sample in samples if sample is not None]
+        return max(samples) if samples else None
+
+    def write_report(self):
+        """Menulis report JSON (atomik). Dipanggil otomatis setelah setiap fase."""
+        if not self.enabled or not self.report_path:
+            return
+        tmp_path = self.report_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+        os.replace(tmp_path, self.report_path)
+
+    def print_summary(self):
+        """Mencetak ringkasan report ke console."""
+        if not self.enabled:
+            return
+        report = self.report()
+        print("\n=== PROFIL MEMORI & THROUGHPUT BUILD ===")
+        print(f"{'Fase':<20} {'Detik':>8} {'Dok/detik':>11} {'RSS akhir':>11} {'Peak RSS':>11} {'Peak Python':>12}")
+        for phase in report['phases']:
+            docs_per_sec = f"{phase['docs_per_sec']:.1f}" if phase['docs_per_sec'] else "-"
+            print(
+                f"{phase['name']:<20} {phase['seconds']:>8.2f} {docs_per_sec:>11} "
+                f"{format_bytes(phase['rss_end_bytes']):>11} {format_bytes(phase['peak_rss_bytes']):>11} "
+                f"{format_bytes(phase['traced_peak_bytes']):>12}"
+            )
+
+        print("\nStruktur data utama:")
+        for structure in report['structures']:
+            location = " (memory-mapped, di disk)" if structure['memory_mapped'] else ""
+            print(
+                f"  - {structure['name']:<28} {format_bytes(structure['bytes']):>11} "
+                f"| {format_bytes(structure['bytes_per_doc'])}/dok | fase {structure['phase']}{location}"
+            )
+
+        print(
+            f"\nPeak RSS: {format_bytes(report['peak_rss_bytes'])} (baseline {format_bytes(report['baseline_rss_bytes'])}, "
+            f"+{format_bytes(report['peak_rss_growth_bytes_per_doc'])}/dok) | "
+            f"Peak memori Python: {format_bytes(report['peak_traced_bytes'])} di fase {report['peak_traced_phase']}"
+        )
+        if self.report_path:
+            print(f"Report lengkap: {self.report_path}")
+        print("========================================")
+
+
+def current_rss():
+    """RSS proses saat ini dalam bytes (Linux: /proc/self/statm). None jika tidak tersedia."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss():
+    """Peak RSS proses sejak dimulai dalam bytes. None jika tidak tersedia."""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux melaporkan KB, macOS melaporkan bytes
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def estimate_bytes(obj):
+    """
+    Perkiraan memori (bytes) sebuah struktur: DataFrame/Series (deep), array NumPy, matriks sparse,
+    atau list/dict beserta isinya. Objek yang dipakai bersama (misal string yang ada di list record
+    dan DataFrame sekaligus) dihitung di setiap struktur, jadi total antar struktur bisa lebih besar.
+    Array yang memory-mapped dihitung ukurannya walaupun tidak berada di RAM (lihat memory_mapped).
+    """
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if sparse.issparse(obj):
+        obj = obj.tocsr() if not hasattr(obj, 'indptr') else obj
+        return int(obj.data.nbytes + obj.indices.nbytes + obj.indptr.nbytes)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_bytes(value) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(estimate_bytes(item) for item in obj)
+    return sys.getsizeof(obj)
+
+
+def format_bytes(value):
+    """Format bytes ke satuan yang mudah dibaca (KB/MB/GB)."""
+    if value is None:
+        return "-"
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(value) < 1024 or unit == "GB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+
+
+def _is_memory_mapped(obj):
+    if sparse.issparse(obj):
+        obj = getattr(obj, 'data', None)
+    while isinstance(obj, np.ndarray):
+        if isinstance(obj, np.memmap):
+            return True
+        obj = obj.base
+    return isinstance(obj, mmap.mmap)
+
+
+def _take_snapshot():
+    # Alokasi milik tracemalloc & modul ini sendiri tidak relevan untuk report
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ))
+
+
+def _top_allocations(snapshot, previous, limit):
+    """Lokasi kode (file:baris) dengan pertambahan memori terbesar selama fase."""
+    stats = snapshot.compare_to(previous, 'lineno') if previous is not None else snapshot.statistics('lineno')
+    top = sorted(stats, key=lambda stat: getattr(stat, 'size_diff', stat.size), reverse=True)[:limit]
+    return [
+        {
+            'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            'size_diff_bytes': getattr(stat, 'size_diff', stat.size),
+            'size_bytes': stat.size,
+        }
+        for stat in top
+    ]
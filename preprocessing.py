@@ -1,31 +1,18 @@
 import pandas as pd
-import re
 import os
 import sys
 import csv
 import time
+from text_normalizer import TextNormalizer
 
 # --- KONFIGURASI UMUM ---
 # 1. Tentukan folder data mentah dan folder hasil pemrosesan
 RAW_DATA_PATH = "datasets"
 CLEAN_DATA_PATH = "datasets_clean"
 
-# 2. Daftar Stopword Bahasa Indonesia (Pure Python Standard Library)
-# List ini diambil dari sumber umum (Stopwords Indonesia) dan dihardcode untuk menghindari Sastrawi/NLTK.
-# Jika ingin lebih lengkap, tambahkan kata-kata di sini.
-STOPWORDS = set([
-    "yang", "untuk", "pada", "ke", "para", "namun", "menurut", "tentang", "demikian", 
-    "adalah", "dengan", "adanya", "adapun", "akan", "adalah", "adanya", "adapun", 
-    "agak", "agar", "akibat", "akhir", "akhirnya", "aku", "akan", "adalah", "adanya", 
-    "adapun", "agak", "agar", "akibat", "akhir", "akhirnya", "aku", "anda", "apakah", 
-    "apabila", "atau", "bagai", "bahkan", "bahwa", "begini", "begitu", "belum", "bisa", 
-    "cuma", "dapat", "dari", "dan", "di", "dia", "diri", "dlm", "dua", "empat", "enggak",
-    "hal", "hanya", "ia", "ini", "itu", "jangan", "jika", "kami", "kamu", "kali", "karena", 
-    "ketika", "kita", "kok", "lah", "lima", "maka", "mana", "mereka", "nih", "nya", "oleh", 
-    "pada", "paling", "para", "pun", "saja", "sambil", "sana", "satu", "sebagai", "sejak", 
-    "selalu", "semua", "sendiri", "seperti", "serta", "siapa", "sudah", "tiga", "tujuh", 
-    "untuk", "wah", "yakni", "yaitu", "yg", "uu", "aa"
-])
+# 2. Normalizer tanpa stemming (cukup Case Folding, Cleaning & Stopword Removal).
+# Stopword diambil dari Sastrawi lewat modul bersama agar sama dengan ir.py / pi.py.
+normalizer = TextNormalizer(stem=False)
 
 # Menambah batas ukuran field (wajib untuk CSV dengan teks panjang)
 csv.field_size_limit(sys.maxsize) 
@@ -33,25 +20,7 @@ csv.field_size_limit(sys.maxsize)
 # --- FUNGSI PREPROCESSING ---
 def preprocess_text(text):
     """Melakukan Case Folding, Cleaning Teks, dan Stopword Removal."""
-    if pd.isna(text) or text is None:
-        return ""
-
-    text = str(text) 
-    
-    # 1. Case Folding (Wajib)
-    text = text.lower()
-    
-    # 2. Pembersihan Karakter (Hapus non-huruf dan non-spasi, termasuk angka)
-    text = re.sub(r'[^a-z\s]', ' ', text) 
-    
-    # 3. Hapus spasi ganda dan spasi di awal/akhir
-    text = re.sub(r'\s+', ' ', text).strip()
-    
-    # 4. Tokenization dan Stopword Removal (Wajib)
-    tokens = text.split()
-    tokens = [word for word in tokens if word not in STOPWORDS and len(word) > 1]
-    
-    return " ".join(tokens)
+    return normalizer.normalize(text)
 
 # --- FUNGSI UTAMA UNTUK ANGGOTA TIM ---
 def process_and_save_datasets(file_name, text_column_name='konten', title_column_name='judul', max_rows=None):
@@ -99,29 +68,25 @@ def process_and_save_datasets(file_name, text_column_name='konten', title_column
         return
 
     total_rows = len(df)
-    processed_counter = 0
-    last_percentage_printed = -5
     
     print(f"INFO: Total {total_rows} baris ditemukan. Mulai Normalisasi...")
     
     # Tambahkan Kolom Baru untuk Teks yang Sudah Bersih
-    df['clean_content'] = ''
-    
-    for index, row in df.iterrows():
-        # Lakukan Preprocessing
-        clean_text = preprocess_text(row[text_column_name])
-        df.loc[index, 'clean_content'] = clean_text
-        
-        processed_counter += 1
-        
+    raw_texts = df[text_column_name].tolist()
+    clean_texts = []
+
+    # Preprocessing per chunk (kelipatan 5%) dengan bulk API normalizer
+    chunk_size = max(1, -(-total_rows // 20))
+
+    for chunk_start in range(0, total_rows, chunk_size):
+        chunk_end = min(chunk_start + chunk_size, total_rows)
+        clean_texts.extend(normalizer.normalize_many(raw_texts[chunk_start:chunk_end]))
+
         # LOGIKA PROGRESS BAR (MENCETAK KELIPATAN 5%)
-        current_percentage = int((processed_counter / total_rows) * 100)
-        
-        if current_percentage >= last_percentage_printed + 5 or processed_counter == total_rows:
-            if processed_counter != total_rows:
-                last_percentage_printed = current_percentage
-                
-            print(f"\r  -> Progress {file_name}: {processed_counter}/{total_rows} ({current_percentage}%)", end="", flush=True)
+        current_percentage = int((chunk_end / total_rows) * 100)
+        print(f"\r  -> Progress {file_name}: {chunk_end}/{total_rows} ({current_percentage}%)", end="", flush=True)
+
+    df['clean_content'] = clean_texts
 
     
     # --- DEMO PREPROCESSING (HANYA JIKA MEMBATASI BARIS) ---
@@ -157,7 +122,7 @@ def process_and_save_datasets(file_name, text_column_name='konten', title_column
 if __name__ == "__main__":
     
     print("\n=============================================")
-    print("  SKRIP PREPROCESSING datasets (NON-SASTRAWI)")
+    print("  SKRIP PREPROCESSING datasets (TANPA STEMMING)")
     print("=============================================")
     
     # --- PANDUAN PENGGUNAAN TIM ---
@@ -0,0 +1,154 @@
+import os
+import numpy as np
+from scipy import sparse
+from text_normalizer import TOKEN_PATTERN
+from string_blob import encode_strings, decode_strings
+
+# --- FAST PATH PREPROCESSING QUERY ---
+# Saat build, setiap kata permukaan (surface word, hasil case folding + tokenisasi) yang muncul
+# di korpus dipetakan sekali ke hasil stem-nya dan ke id kolom vocabulary VSM.
+# Saat query, kata cukup di-lookup di tabel ini lalu langsung dijadikan vektor query sparse,
+# tanpa Sastrawi dan tanpa vectorizer.transform. Sastrawi hanya dipanggil untuk kata yang
+# tidak pernah muncul di korpus.
+# Disimpan ringkas di generation (query_analyzer.npz):
+#   words    -> kata permukaan (blob utf-8, dipisah '\n'), terurut
+#   stem_ids -> index ke `stems` per kata, -1 jika hasil stem dibuang (stopword / terlalu pendek)
+#   stems    -> hasil stem unik (blob utf-8)
+#   columns  -> id kolom VSM per stem, -1 jika stem tidak ada di vocabulary
+
+QUERY_ANALYZER_FILE = "query_analyzer.npz"
+
+
+class QueryAnalyzer:
+    """
+    Lookup kata permukaan -> (stem, kolom vocabulary) untuk mengubah query menjadi vektor sparse.
+    Hasilnya identik dengan vectorizer.transform([normalizer.normalize(query)]).
+
+    Parameters:
+        words (list): Kata permukaan yang dikenal.
+        stem_ids (ndarray): Index stem per kata (-1 = dibuang oleh normalizer).
+        stems (list): Hasil stem unik.
+        columns (ndarray): Kolom vocabulary per stem (-1 = tidak ada di vocabulary).
+        vectorizer: Vectorizer index (dipakai untuk kata yang belum dikenal).
+    """
+
+    def __init__(self, words, stem_ids, stems, columns, vectorizer):
+        self.word_ids = dict(zip(words, np.asarray(stem_ids).tolist()))
+        self.stems = stems
+        self.stem_index = {stem: stem_id for stem_id, stem in enumerate(stems)}
+        self.columns = np.asarray(columns).tolist()
+        self.vectorizer = vectorizer
+        vocabulary = getattr(vectorizer, 'vocabulary_', None)
+        self.n_features = len(vocabulary) if vocabulary is not None else vectorizer.n_features
+
+    @classmethod
+    def build(cls, texts, normalizer, vectorizer):
+        """Mengumpulkan kata permukaan dari teks mentah korpus dan memetakannya ke stem & kolom."""
+        words = set()
+        for text in texts:
+            if text is None or text != text: # None atau NaN
+                continue
+            words.update(TOKEN_PATTERN.findall(str(text).lower()))
+        words = sorted(words)
+
+        stem_index, stems, stem_ids = {}, [], []
+        for word in words:
+            # Kata permukaan selalu [a-z]+, jadi hasil tokenize berisi paling banyak satu stem
+            tokens = normalizer.tokenize(word)
+            if not tokens:
+                stem_ids.append(-1)
+                continue
+            stem = tokens[0]
+            if stem not in stem_index:
+                stem_index[stem] = len(stems)
+                stems.append(stem)
+            stem_ids.append(stem_index[stem])
+
+        return cls(words, stem_ids, stems, _lookup_columns(vectorizer, stems), vectorizer)
+
+    def analyze(self, query_text, normalizer):
+        """
+        Mengembalikan (terms, query_vector): list stem query (urut kemunculan, untuk saran ejaan)
+        dan vektor query CSR (1 x n_features) berisi frekuensi term.
+        """
+        terms, counts = [], {}
+        for word in TOKEN_PATTERN.findall(str(query_text).lower()):
+            stem_id = self.word_ids.get(word)
+            if stem_id is None:
+                # Kata belum pernah muncul di korpus: stem dengan Sastrawi (hasilnya di-cache normalizer)
+                tokens = normalizer.tokenize(word)
+                if not tokens:
+                    continue
+                stem = tokens[0]
+                stem_id = self.stem_index.get(stem)
+                column = self.columns[stem_id] if stem_id is not None else _lookup_columns(self.vectorizer, [stem])[0]
+            elif stem_id < 0:
+                continue
+            else:
+                stem, column = self.stems[stem_id], self.columns[stem_id]
+
+            terms.append(stem)
+            if column >= 0:
+                counts[column] = counts.get(column, 0) + 1
+
+        columns = sorted(counts)
+        query_vector = sparse.csr_matrix(
+            (np.array([counts[column] for column in columns], dtype=np.float64), np.array(columns, dtype=np.int64), [0, len(columns)]),
+            shape=(1, self.n_features),
+        )
+        return terms, query_vector
+
+    def unknown_words(self, query_text, normalizer):
+        """
+        Kata query (urut kemunculan, unik) yang tidak dikenal index: kata permukaannya tidak pernah
+        muncul di korpus dan hasil stem-nya juga bukan stem korpus. Kata yang stem-nya dikenal
+        (misal bentuk imbuhan lain) tidak dianggap salah eja.
+        """
+        unknown = []
+        for word in dict.fromkeys(TOKEN_PATTERN.findall(str(query_text).lower())):
+            if word in self.word_ids:
+                continue
+            tokens = normalizer.tokenize(word)
+            if tokens and tokens[0] not in self.stem_index:
+                unknown.append(word)
+        return unknown
+
+    def save(self, path):
+        """Menyimpan tabel lookup ke `path/query_analyzer.npz`."""
+        words = sorted(self.word_ids)
+        np.savez(
+            os.path.join(path, QUERY_ANALYZER_FILE),
+            words=encode_strings(words),
+            stem_ids=np.array([self.word_ids[word] for word in words], dtype=np.int32),
+            stems=encode_strings(self.stems),
+            columns=np.array(self.columns, dtype=np.int64),
+        )
+
+    @classmethod
+    def load(cls, path, vectorizer):
+        """Memuat tabel lookup dari `path/query_analyzer.npz`."""
+        with np.load(os.path.join(path, QUERY_ANALYZER_FILE)) as data:
+            return cls(
+                decode_strings(data['words']),
+                data['stem_ids'],
+                decode_strings(data['stems']),
+                data['columns'],
+                vectorizer,
+            )
+
+
+def _lookup_columns(vectorizer, stems):
+    """Kolom vocabulary setiap stem: lookup vocabulary_ (CountVectorizer) atau hash (HashingVectorizer)."""
+    vocabulary = getattr(vectorizer, 'vocabulary_', None)
+    if vocabulary is not None:
+        return [vocabulary.get(stem, -1) for stem in stems]
+    if not stems:
+        return []
+
+    # Setiap stem adalah satu token, jadi setiap baris hasil hash berisi tepat satu fitur
+    hashed = vectorizer.transform(stems).tocsr()
+    return [
+        int(hashed.indices[hashed.indptr[row]]) if hashed.indptr[row + 1] > hashed.indptr[row] else -1
+        for row in range(len(stems))
+    ]
+
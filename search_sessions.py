@@ -0,0 +1,123 @@
+import secrets
+import threading
+from collections import OrderedDict
+
+# --- SESI HASIL PENCARIAN (PAGINATION) ---
+# Setiap query yang dipaginasi disimpan sebagai sesi berisi prefix hasil ranking yang sudah
+# terurut (doc index + skor). Halaman berikutnya cukup di-slice dari prefix tanpa scoring ulang.
+# Prefix hanya diperpanjang (scoring ulang dengan k lebih besar) saat client membuka halaman
+# di luar prefix. Jumlah sesi dibatasi; sesi yang paling lama tidak dipakai dibuang (LRU).
+# Sesi hanya disimpan untuk generation yang aktif: saat generation baru diaktifkan, sesi milik
+# generation lama dibuang agar tidak menahan index lama (DataFrame, matriks) tetap di memori.
+
+DEFAULT_MAX_SESSIONS = 128
+DEFAULT_PREFIX_SIZE = 50
+DEFAULT_MAX_PREFIX_SIZE = 5000
+
+
+class SearchSession:
+    """Satu query yang sedang dipaginasi: snapshot index, vektor query dan prefix ranking."""
+
+    def __init__(self, session_id, index, query_text, query_vector, selection=None):
+        self.session_id = session_id
+        self.index = index # Snapshot generation; sesi dibuang saat generation lain diaktifkan (cursor kedaluwarsa)
+        self.query_text = query_text
+        self.query_vector = query_vector
+        self.selection = selection # Filter dokumen (doc_filters.DocSelection), None = semua dokumen
+        self.doc_indices = None
+        self.scores = None
+        self.exhausted = False # True jika prefix sudah memuat semua dokumen dengan skor > 0
+
+
+class SearchSessionStore:
+    """
+    Penyimpanan sesi pencarian dengan batas jumlah sesi (LRU) dan batas ukuran prefix per sesi.
+
+    Parameters:
+        max_sessions (int): Jumlah sesi maksimum yang disimpan.
+        prefix_size (int): Ukuran prefix awal yang di-scoring untuk query baru.
+        max_prefix_size (int): Ukuran prefix maksimum yang disimpan per sesi. Halaman di luar
+            batas ini tetap dilayani (scoring ulang) tetapi hasilnya tidak disimpan.
+    """
+
+    def __init__(self, max_sessions=DEFAULT_MAX_SESSIONS, prefix_size=DEFAULT_PREFIX_SIZE, max_prefix_size=DEFAULT_MAX_PREFIX_SIZE):
+        self.max_sessions = max_sessions
+        self.prefix_size = prefix_size
+        self.max_prefix_size = max_prefix_size
+        self.active_generation = None # Nama generation aktif; None = terima sesi dari generation mana pun
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, index, query_text, query_vector, selection=None):
+        """
+        Membuat sesi baru (prefix belum di-scoring). Sesi paling lama dibuang jika penuh.
+        Sesi untuk generation yang sudah tidak aktif (query dimulai tepat sebelum swap) tetap
+        bisa dipakai untuk halaman pertama, tetapi tidak disimpan (cursor-nya akan kedaluwarsa).
+        """
+        session = SearchSession(secrets.token_hex(8), index, query_text, query_vector, selection)
+        with self._lock:
+            if self.active_generation is not None and index.name != self.active_generation:
+                return session
+            self._sessions[session.session_id] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session
+
+    def set_active_generation(self, generation_name):
+        """Mencatat generation aktif dan membuang sesi milik generation lain. Mengembalikan jumlah sesi yang dibuang."""
+        with self._lock:
+            self.active_generation = generation_name
+            stale = [
+                session_id for session_id, session in self._sessions.items()
+                if session.index.name != generation_name
+            ]
+            for session_id in stale:
+                del self._sessions[session_id]
+        return len(stale)
+
+    def get(self, session_id):
+        """Mengambil sesi (None jika tidak ada / sudah dibuang) dan menandainya baru dipakai."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def get_page(self, session, offset, page_size):
+        """
+        Mengembalikan (doc_indices, scores, has_more) untuk hasil ke-[offset, offset + page_size).
+        Prefix diperpanjang (dua kali lipat) hanya jika halaman berada di luar prefix yang tersimpan.
+        """
+        end = offset + page_size
+        if session.doc_indices is None or (end > len(session.doc_indices) and not session.exhausted):
+            stored = len(session.doc_indices) if session.doc_indices is not None else 0
+            needed = max(end, self.prefix_size, 2 * stored)
+            if end <= self.max_prefix_size:
+                needed = min(needed, self.max_prefix_size)
+
+            doc_indices, scores = session.index.scorer.top_k(session.query_vector, needed, session.selection)
+            exhausted = len(doc_indices) < needed
+            if needed > self.max_prefix_size:
+                # Di luar batas memori sesi: layani dari hasil scoring ini tanpa menyimpannya
+                return doc_indices[offset:end], scores[offset:end], end < len(doc_indices) or not exhausted
+
+            session.doc_indices, session.scores, session.exhausted = doc_indices, scores, exhausted
+
+        has_more = end < len(session.doc_indices) or not session.exhausted
+        return session.doc_indices[offset:end], session.scores[offset:end], has_more
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+def make_cursor(session_id, offset):
+    """Cursor halaman berikutnya: '<session_id>:<offset>'."""
+    return f"{session_id}:{offset}"
+
+
+def parse_cursor(cursor):
+    """Mengembalikan (session_id, offset). Raise ValueError jika format cursor tidak valid."""
+    session_id, _, offset = cursor.partition(':')
+    if not session_id or not offset.isdigit():
+        raise ValueError(f"Cursor tidak valid: {cursor!r}")
+    return session_id, int(offset)
@@ -0,0 +1,17 @@
+import numpy as np
+
+# --- DAFTAR STRING SEBAGAI BLOB NPZ ---
+# List string (term typeahead, kata permukaan, stem) disimpan di file .npz sebagai satu array
+# uint8 berisi teks utf-8 yang dipisah '\n', bukan array object (tidak perlu allow_pickle saat load).
+# String yang disimpan hanya berisi huruf a-z, jadi tidak pernah mengandung '\n'.
+
+
+def encode_strings(strings):
+    """List string -> array uint8 (utf-8, dipisah '\\n')."""
+    return np.frombuffer('\n'.join(strings).encode('utf-8'), dtype=np.uint8)
+
+
+def decode_strings(blob):
+    """Kebalikan encode_strings. Blob kosong -> list kosong."""
+    text = blob.tobytes().decode('utf-8')
+    return text.split('\n') if text else []
@@ -0,0 +1,204 @@
+import os
+import zlib
+import bisect
+import numpy as np
+from string_blob import encode_strings, decode_strings
+
+# --- TYPEAHEAD / SARAN KATA DARI VOCABULARY INDEX ---
+# Term typeahead adalah kata permukaan korpus (bukan hasil stem), karena yang diketik pengguna
+# adalah kata utuh: "pembel" harus dilengkapi menjadi "pembelajaran", bukan dicocokkan ke stem "ajar".
+# Setiap kata diberi DF stem-nya (jumlah dokumen yang memuat stem tsb di konten atau judul).
+# Term disimpan sebagai list terurut (array-backed) + array document frequency (DF).
+# Completion untuk prefix pendek (<= PREFIX_TABLE_LENGTH huruf) sudah dihitung saat build,
+# prefix yang lebih panjang dijawab dengan bisect pada term terurut (rentangnya sudah kecil).
+# Saran ejaan (edit distance) memakai indeks "deletion" ala SymSpell yang dibuat saat build dan ikut
+# disimpan: setiap varian deletion di-hash (crc32) menjadi dua array terurut (hash, index term),
+# sehingga query hanya melakukan searchsorted. Indeks dibatasi SUGGEST_MAX_TERMS kata dengan DF
+# tertinggi (kata langka di korpus permukaan kebanyakan nama/typo, dan memperbesar indeks ~10x panjangnya).
+
+TYPEAHEAD_FILE = "typeahead.npz"
+DEFAULT_TOP_N = 10
+PREFIX_TABLE_LENGTH = 3
+MAX_EDIT_DISTANCE = 2
+SUGGEST_MAX_TERMS = 200_000
+_PREFIX_END = '{' # Karakter setelah 'z', penanda akhir rentang prefix (term hanya berisi a-z)
+
+
+class Typeahead:
+    """
+    Completion prefix dan saran ejaan dari kata permukaan korpus index.
+
+    Parameters:
+        terms (list): Kata permukaan, terurut alfabetis.
+        doc_freqs (ndarray): DF stem tiap kata (sejajar dengan `terms`).
+        top_n (int): Jumlah completion yang disimpan per prefix.
+        prefix_table (dict, optional): prefix -> array index term (hasil precompute).
+        deletes (tuple, optional): (hash varian deletion terurut, index term) hasil precompute.
+    """
+
+    def __init__(self, terms, doc_freqs, top_n=DEFAULT_TOP_N, prefix_table=None, deletes=None):
+        self.terms = terms
+        self.doc_freqs = np.asarray(doc_freqs, dtype=np.int64)
+        self.top_n = top_n
+        self.prefix_table = prefix_table if prefix_table is not None else self._build_prefix_table()
+        self.delete_keys, self.delete_ids = deletes if deletes is not None else self._build_deletes()
+
+    @classmethod
+    def from_query_analyzer(cls, query_analyzer, stem_doc_freqs, top_n=DEFAULT_TOP_N):
+        """
+        Membuat typeahead dari kata permukaan QueryAnalyzer. `stem_doc_freqs` sejajar dengan
+        `query_analyzer.stems`; kata yang stem-nya dibuang normalizer atau ber-DF 0 dilewati.
+        """
+        stem_doc_freqs = np.asarray(stem_doc_freqs)
+        terms, doc_freqs = [], []
+        for word, stem_id in sorted(query_analyzer.word_ids.items()):
+            if stem_id >= 0 and stem_doc_freqs[stem_id] > 0:
+                terms.append(word)
+                doc_freqs.append(stem_doc_freqs[stem_id])
+        return cls(terms, doc_freqs, top_n)
+
+    def complete(self, prefix, limit=None):
+        """Mengembalikan list (term, df) yang diawali `prefix`, urut DF tertinggi."""
+        limit = limit or self.top_n
+        prefix = prefix.lower()
+        if not prefix:
+            return []
+
+        if len(prefix) <= PREFIX_TABLE_LENGTH:
+            term_ids = self.prefix_table.get(prefix, ())
+        else:
+            lo = bisect.bisect_left(self.terms, prefix)
+            hi = bisect.bisect_left(self.terms, prefix + _PREFIX_END, lo)
+            term_ids = self._top_ids(lo, hi, limit)
+        return [(self.terms[term_id], int(self.doc_freqs[term_id])) for term_id in term_ids[:limit]]
+
+    def contains(self, term):
+        """True jika term ada di daftar kata typeahead."""
+        position = bisect.bisect_left(self.terms, term)
+        return position < len(self.terms) and self.terms[position] == term
+
+    def suggest(self, word, limit=5, max_distance=MAX_EDIT_DISTANCE):
+        """
+        Saran kata terdekat (edit distance <= max_distance) untuk kata yang tidak dikenal index.
+        Kandidat diambil dari indeks deletion jarak 1 di kedua sisi: semua typo jarak 1 dan
+        sebagian besar typo jarak 2 (transposisi, hapus + sisip) tertangkap tanpa memindai vocabulary.
+        Tabrakan hash hanya menambah kandidat, yang tetap diverifikasi dengan edit distance.
+        """
+        keys = np.array([_hash_variant(variant) for variant in _deletion_variants(word)], dtype=np.uint32)
+        starts = np.searchsorted(self.delete_keys, keys, side='left')
+        ends = np.searchsorted(self.delete_keys, keys, side='right')
+        candidates = set()
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            candidates.update(self.delete_ids[start:end].tolist())
+
+        scored = []
+        for term_id in candidates:
+            distance = _edit_distance(word, self.terms[term_id], max_distance)
+            if distance <= max_distance:
+                scored.append((distance, -int(self.doc_freqs[term_id]), self.terms[term_id]))
+        scored.sort()
+        return [(term, -neg_df) for _, neg_df, term in scored[:limit]]
+
+    def save(self, path):
+        """Menyimpan term, DF, tabel prefix dan indeks deletion ke `path/typeahead.npz`."""
+        prefixes = sorted(self.prefix_table)
+        completions = np.full((len(prefixes), self.top_n), -1, dtype=np.int32)
+        for row, prefix in enumerate(prefixes):
+            term_ids = self.prefix_table[prefix]
+            completions[row, :len(term_ids)] = term_ids
+
+        np.savez(
+            os.path.join(path, TYPEAHEAD_FILE),
+            terms=encode_strings(self.terms),
+            doc_freqs=self.doc_freqs,
+            prefixes=encode_strings(prefixes),
+            completions=completions,
+            delete_keys=self.delete_keys,
+            delete_ids=self.delete_ids,
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Memuat typeahead dari `path/typeahead.npz`."""
+        with np.load(os.path.join(path, TYPEAHEAD_FILE)) as data:
+            terms = decode_strings(data['terms'])
+            prefixes = decode_strings(data['prefixes'])
+            completions = data['completions']
+            prefix_table = {
+                prefix: row[row >= 0] for prefix, row in zip(prefixes, completions)
+            }
+            deletes = (data['delete_keys'], data['delete_ids'])
+            return cls(terms, data['doc_freqs'], completions.shape[1], prefix_table, deletes)
+
+    def _top_ids(self, lo, hi, limit):
+        """Index term dengan DF tertinggi di rentang [lo, hi), urut DF menurun lalu alfabetis."""
+        if hi <= lo:
+            return np.zeros(0, dtype=np.int64)
+        doc_freqs = self.doc_freqs[lo:hi]
+        if hi - lo > limit:
+            # Ambil semua term dengan DF >= DF ke-`limit` agar term seri diurutkan alfabetis dengan benar
+            kth_doc_freq = np.partition(doc_freqs, hi - lo - limit)[hi - lo - limit]
+            candidates = np.flatnonzero(doc_freqs >= kth_doc_freq)
+        else:
+            candidates = np.arange(hi - lo)
+        order = np.lexsort((candidates, -doc_freqs[candidates]))[:limit]
+        return candidates[order] + lo
+
+    def _build_prefix_table(self):
+        """Precompute top-N completion untuk setiap prefix sepanjang 1..PREFIX_TABLE_LENGTH."""
+        table = {}
+        for length in range(1, PREFIX_TABLE_LENGTH + 1):
+            group_start, group_prefix = 0, None
+            for position, term in enumerate(self.terms + [None]):
+                prefix = term[:length] if term is not None else None
+                if prefix != group_prefix:
+                    if group_prefix is not None and len(group_prefix) == length:
+                        table[group_prefix] = self._top_ids(group_start, position, self.top_n)
+                    group_start, group_prefix = position, prefix
+        return table
+
+    def _build_deletes(self):
+        """
+        Indeks deletion jarak 1 untuk SUGGEST_MAX_TERMS kata dengan DF tertinggi: hash setiap varian
+        (kata dengan 1 huruf dihapus) dan index kata-nya, diurutkan menurut hash.
+        """
+        term_ids = np.arange(len(self.terms))
+        if len(term_ids) > SUGGEST_MAX_TERMS:
+            term_ids = np.sort(np.lexsort((term_ids, -self.doc_freqs))[:SUGGEST_MAX_TERMS])
+
+        keys, ids = [], []
+        for term_id in term_ids.tolist():
+            variants = _deletion_variants(self.terms[term_id])
+            keys.extend(_hash_variant(variant) for variant in variants)
+            ids.extend([term_id] * len(variants))
+
+        keys = np.array(keys, dtype=np.uint32)
+        ids = np.array(ids, dtype=np.int32)
+        order = np.argsort(keys, kind='stable')
+        return keys[order], ids[order]
+
+
+def _deletion_variants(word):
+    """Kata itu sendiri + semua varian dengan satu huruf dihapus."""
+    return {word} | {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+def _hash_variant(variant):
+    """Hash stabil (tidak berubah antar proses, tidak seperti hash() bawaan) untuk kunci indeks deletion."""
+    return zlib.crc32(variant.encode('utf-8'))
+
+
+def _edit_distance(a, b, max_distance):
+    """Levenshtein distance dengan batas (berhenti lebih awal jika melebihi max_distance)."""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        current = [i]
+        for j, char_b in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+